@@ -21,7 +21,7 @@ setup(name='timeseria',
       install_requires = [
                           'Keras >=2.1.3, <3.0.0',
                           'matplotlib >=2.1.2, <4.0.0',
-                          'numpy >=1.19.5, <2.0.0',
+                          'numpy >=1.20.0, <2.0.0',
                           'scikit-learn >=0.2.2, <2.0.0',
                           'pandas >=0.23.4, <2.0.0',
                           'chardet >=3.0.4, <4.0.0',
@@ -4,7 +4,7 @@
 from .time import s_from_dt , dt_from_s, UTC, timezonize
 from .units import Unit, TimeUnit
 from .utilities import is_close, to_time_unit_string
-from copy import deepcopy
+from copy import copy, deepcopy
 from pandas import DataFrame
 from datetime import datetime
 from .exceptions import ConsistencyException
@@ -475,6 +475,13 @@ class Point():
     def __getitem__(self,index):
         return self.coordinates[index]
 
+    def __copy__(self):
+        # Points only hold the (immutable) coordinates and a few other plain attributes, so
+        # a shallow copy can be made much faster than by using the generic copy protocol.
+        point = object.__new__(self.__class__)
+        point.__dict__.update(self.__dict__)
+        return point
+
 
 class TimePoint(Point):
     """A point in the time dimension.
@@ -657,6 +664,15 @@ class DataPoint(Point):
         except AttributeError:
             return list(range(len(self.data)))
 
+    def clone(self):
+        """Return a copy of the point with its own data and data indexes. Much faster than a deepcopy,
+        but the data values themselves are not copied (which is fine for the usual numerical data)."""
+        clone = object.__new__(self.__class__)
+        clone.__dict__.update(self.__dict__)
+        clone._data = copy(self._data)
+        clone._data_indexes = copy(self._data_indexes)
+        return clone
+
 
 class DataTimePoint(DataPoint, TimePoint):
     """A point that carries some data in the time dimension.
@@ -1336,6 +1352,17 @@ class DataSlot(Slot):
         except AttributeError:
             return list(range(len(self.data)))    
 
+    def clone(self):
+        """Return a copy of the slot with its own start and end points, data and data indexes. Much faster than
+        a deepcopy, but the data values themselves are not copied (which is fine for the usual numerical data)."""
+        clone = object.__new__(self.__class__)
+        clone.__dict__.update(self.__dict__)
+        clone.start = copy(self.start)
+        clone.end = copy(self.end)
+        clone._data = copy(self._data)
+        clone._data_indexes = copy(self._data_indexes)
+        return clone
+
 
 class DataTimeSlot(DataSlot, TimeSlot):
     """A slot that carries some data in the time dimension. Can be initialized
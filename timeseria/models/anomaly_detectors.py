@@ -1,7 +1,7 @@
 # -*- coding: utf-8 -*-
 """Anomaly detection models."""
 
-from copy import deepcopy
+from numpy import array, flatnonzero
 
 # Base models and utilities
 from .base import TimeSeriesParametricModel
@@ -111,31 +111,13 @@ class ForecastBasedAnomalyDetector(AnomalyDetector):
         self.forecaster.save(path+'/'+str(self.forecaster.id))
 
 
-    def __get_actual_and_predicted(self, timeseries, i, key, forecaster_window):
+    def __get_actuals_and_predicteds(self, timeseries, key, forecaster_window):
 
-        # Call model predict logic and compare with the actual data
-        actual = timeseries[i].data[key]
+        # Get the actual values and the one step-ahead predictions of the forecaster, for all the items after its window
+        actuals = array([timeseries[i].data[key] for i in range(forecaster_window+1, len(timeseries))], dtype=float)
+        predicteds = self.forecaster._predict_one_step_ahead(timeseries, forecaster_window+1, len(timeseries))
         
-        try:
-            # Try the optimized predict call (which just use the data as-is)
-            prediction = self.forecaster.predict(timeseries, steps=1, forecast_start = i-1)
-            
-        except TypeError as e:
-            if '_predict() got an unexpected keyword argument \'forecast_start\'' in str(e):
-                # Otherwise, create on the fly a slice of the time series for the window.
-                # Datapoints are only linked, not copied - so this is just a minor overhead.
-                window_timeseries = timeseries[i-forecaster_window:i]
-                prediction = self.forecaster.predict(window_timeseries, steps=1)
-            else:
-                raise e
-
-        # TODO: this is because of forecasters not supporting multi-step forecasts.
-        if not isinstance(prediction, list):
-            predicted = prediction[key]
-        else:
-            predicted = prediction[0][key]
-        
-        return (actual, predicted)
+        return (actuals, predicteds)
 
     def fit(self, timeseries, *args, stdevs=3, **kwargs):
         """Fit the anomaly detection model.
@@ -158,23 +140,16 @@ class ForecastBasedAnomalyDetector(AnomalyDetector):
         self.forecaster.fit(timeseries, *args, **kwargs)
         
         # Evaluate the forecaster for one step ahead and get AEs
-        AEs = []
-        for key in timeseries.data_labels():
-            
-            for i, _ in enumerate(timeseries):
-                
-                forecaster_window = self.forecaster.data['window']
-                
-                if i <=  forecaster_window:    
-                    continue
-                
-                actual, predicted = self.__get_actual_and_predicted(timeseries, i, key, forecaster_window)
-                
-                AEs.append(abs(actual-predicted))
-
-        # Compute distribution for the AEs ans set the threshold
-        from scipy.stats import norm
-        mean, stdev = norm.fit(AEs)
+        forecaster_window = self.forecaster.data['window']
+        key = timeseries.data_labels()[0]
+        actuals, predicteds = self.__get_actuals_and_predicteds(timeseries, key, forecaster_window)
+        AEs = abs(actuals - predicteds)
+        if not len(AEs):
+            raise ValueError('Cannot fit the anomaly detection model as the time series has no items after the forecaster window plus one')
+
+        # Compute distribution for the AEs ans set the threshold. The maximum likelihood
+        # estimate of the stdev of a normal distribution is just the (population) stdev.
+        stdev = float(AEs.std())
         logger.info('Using {} standard deviations as anomaly threshold: {}'.format(stdevs, stdev*stdevs))
         
         # Set AE-based threshold
@@ -193,45 +168,51 @@ class ForecastBasedAnomalyDetector(AnomalyDetector):
         
         result_timeseries = timeseries.__class__()
 
-        for key in timeseries.data_labels():
+        forecaster_window = self.forecaster.data['window']
+        if stdevs:
+            AE_threshold =  self.data['stdev'] * stdevs 
+        else:
+            AE_threshold =  self.data['stdev'] * self.data['stdevs'] 
+
+        key = timeseries.data_labels()[0]
+        
+        # Get the actual and predicted values for all the items first
+        items = [timeseries[i] for i in range(forecaster_window+1, len(timeseries))]
+        actuals, predicteds = self.__get_actuals_and_predicteds(timeseries, key, forecaster_window)
+
+        # Then compute the AEs and mark the anomalies all at once
+        AEs = abs(actuals - predicteds)
+        anomalies = AEs > AE_threshold
+        
+        if logs:
+            for j in flatnonzero(anomalies):
+                logger.info('Detected anomaly for item starting @ {} ({}) with AE="{:.3f}..."'.format(items[j].t, items[j].dt, AEs[j]))
+
+        # Which details to add
+        if isinstance(details, list):
+            add_AE = 'AE' in details
+            add_predicted = 'predicted' in details
+        else:
+            add_AE = add_predicted = bool(details)
+        AE_label = 'AE_{}'.format(key)
+        predicted_label = '{}_predicted'.format(key)
+
+        # Now build the result items
+        for item, AE, predicted, anomaly in zip(items, AEs.tolist(), predicteds.tolist(), anomalies.astype(int).tolist()):
+            
+            # Clone the item rather than deep-copying it, as we only need fresh data
+            # and data indexes to write into (and deepcopy is very expensive).
+            item = item.clone()
             
-            for i, item in enumerate(timeseries):
-                forecaster_window = self.forecaster.data['window']
-                if i <=  forecaster_window:    
-                    continue
-                
-                actual, predicted = self.__get_actual_and_predicted(timeseries, i, key, forecaster_window)
-                #if logs:
-                #    logger.info('{}: {} vs {}'.format(timeseries[i].dt, actual, predicted))
-
-                AE = abs(actual-predicted)
-                
-                item = deepcopy(item)
-                
-                if stdevs:
-                    AE_threshold =  self.data['stdev'] * stdevs 
-                else:
-                    AE_threshold =  self.data['stdev'] * self.data['stdevs'] 
-                    
-                if AE > AE_threshold: 
-                    if logs:
-                        logger.info('Detected anomaly for item starting @ {} ({}) with AE="{:.3f}..."'.format(item.t, item.dt, AE))
-                    item.data_indexes['anomaly'] = 1
-                else:
-                    item.data_indexes['anomaly'] = 0
-                
-                # Add details?
-                if details:
-                    if isinstance(details, list):
-                        if 'AE' in details:
-                            item.data['AE_{}'.format(key)] = AE
-                        if 'predicted' in details:
-                            item.data['{}_predicted'.format(key)] = predicted
-                    else:
-                        item.data['AE_{}'.format(key)] = AE
-                        item.data['{}_predicted'.format(key)] = predicted
-
-                result_timeseries.append(item)
+            item.data_indexes['anomaly'] = anomaly
+            
+            # Add details?
+            if add_AE:
+                item.data[AE_label] = AE
+            if add_predicted:
+                item.data[predicted_label] = predicted
+
+            result_timeseries.append(item)
         
         return result_timeseries 
 
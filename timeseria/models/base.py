@@ -6,10 +6,11 @@ import json
 import uuid
 import statistics
 from ..exceptions import NotFittedError
-from ..utilities import check_timeseries, check_resolution, check_data_labels, item_is_in_range
+from ..utilities import check_timeseries, check_resolution, check_data_labels, get_in_range_indexes, get_periodicity_indexes
 from ..time import now_s, dt_from_s
 from ..units import TimeUnit
 from pandas import DataFrame
+from numpy import array, fromiter, modf, rint, isnan, float64, int64, nan
 import shutil
 
 # Setup logging
@@ -381,6 +382,50 @@ class TimeSeriesParametricModel(ParametricModel):
 
 
 
+#=========================
+#  Base P. Average model
+#=========================
+
+class PeriodicAverageModel():
+    '''Class to wrap some internal common logic for periodic average-based models.'''
+
+    def _set_averages_array(self):
+        # Set the averages as a lookup array by periodicity index as well, so that they can be gathered all at
+        # once with fancy indexing. Periodicity indexes for which there is no average are set to NaN.
+        averages = self.data['averages']
+        self._averages_array = array([averages.get(periodicity_index, nan) for periodicity_index in range(self.data['periodicity'])])
+
+    def _get_averages(self, periodicity_indexes):
+        # Gather the averages for the given periodicity indexes, all at once from the lookup array
+        averages = self._averages_array[periodicity_indexes]
+        missing = isnan(averages)
+        if missing.any():
+            raise ValueError('No average for periodicity index(es) {} as no items were fitted on them'.format(sorted(set(periodicity_indexes[missing].tolist()))))
+        return averages
+
+    def _plot_averages(self, timeseries, **kwargs):
+
+        # Get the averages for all the items at once from the lookup array. Periodicity
+        # indexes without an average (set to NaN in the array) are plotted as zero.
+        values = self._averages_array[get_periodicity_indexes(timeseries, timeseries.resolution, self.data['periodicity'], dst_affected=self.data['dst_affected'])]
+        values[isnan(values)] = 0
+
+        # Build the averages time series with cloned items (no need to deep copy the original ones)
+        averages_timeseries = timeseries.__class__()
+        for item, value in zip(timeseries, values.tolist()):
+            item = item.clone()
+            item.data['periodic_average'] = value
+            averages_timeseries.append(item)
+
+        # Keep the title and the mark of the original series, as used by the plot
+        averages_timeseries.title = timeseries.title
+        if timeseries.mark:
+            averages_timeseries.mark = timeseries.mark
+        if timeseries.mark_title:
+            averages_timeseries.mark_title = timeseries.mark_title
+        averages_timeseries.plot(**kwargs)
+
+
 #=========================
 #  Base Prophet model
 #=========================
@@ -392,34 +437,35 @@ class ProphetModel():
     def _remove_timezone(cls, dt):
         return dt.replace(tzinfo=None)
 
+    @classmethod
+    def _ds_array(cls, dts):
+        """Get the Prophet "ds" column as a numpy datetime64 array, with the timezone removed."""
+        return array([cls._remove_timezone(dt) for dt in dts], dtype='datetime64[us]')
+
+    @classmethod
+    def _ds_array_from_t(cls, ts, count=-1):
+        """Get the Prophet "ds" column as a numpy datetime64 array directly from (an iterable of) epoch timestamps, on UTC.
+        Same as using _ds_array() on their UTC datetimes, but without creating any datetime object."""
+        # Round to microseconds as Python does, i.e. the fractional part of the seconds only and half to even
+        fractional_parts, integer_parts = modf(fromiter(ts, dtype=float64, count=count))
+        return (integer_parts.astype(int64) * 1000000 + rint(fractional_parts * 1000000).astype(int64)).astype('datetime64[us]')
+
     @classmethod
     def _from_timeseria_to_prophet(cls, timeseries, from_t=None, to_t=None):
 
-        # Create Python lists with data
+        # Get the items to use, directly by index
+        items = [timeseries[i] for i in get_in_range_indexes(timeseries, from_t, to_t)]
+
+        # Get the data label (or index) to use
         try:
             timeseries[0].data[0]
-            data_labels_are_indexes = True
+            data_label = 0
         except KeyError:
-            timeseries[0].data.keys()
-            data_labels_are_indexes = False
-        
-        data_as_list=[]
-        for item in timeseries:
-            
-            # Skip if needed
-            try:
-                if not item_is_in_range(item, from_t, to_t):
-                    continue
-            except StopIteration:
-                break                
-
-            if data_labels_are_indexes:     
-                data_as_list.append([cls._remove_timezone(item.dt), item.data[0]])
-            else:
-                data_as_list.append([cls._remove_timezone(item.dt), item.data[list(item.data.keys())[0]]])
+            data_label = list(timeseries[0].data.keys())[0]
 
-        # Create the pandas DataFrames
-        data = DataFrame(data_as_list, columns = ['ds', 'y'])
+        # Create the pandas DataFrames from whole columns
+        data = DataFrame({'ds': cls._ds_array([item.dt for item in items]),
+                          'y': array([item.data[data_label] for item in items])})
 
         return data
 
@@ -507,12 +553,8 @@ class KerasModel():
         '''Compute window datapoints matrix from a time series.'''
         # steps to be intended as steps ahead (for the forecaster)
         window_datapoints = []
-        for i, _ in enumerate(timeseries):
-            if i <  window:
-                continue
-            if i == len(timeseries) + 1 - steps:
-                break
-                    
+        for i in range(window, len(timeseries) + 1 - steps):
+
             # Add window values
             row = []
             for j in range(window):
@@ -529,12 +571,8 @@ class KerasModel():
         data_labels = timeseries.data_labels()
     
         targets = []
-        for i, _ in enumerate(timeseries):
-            if i <  window:
-                continue
-            if i == len(timeseries) + 1 - steps:
-                break
-            
+        for i in range(window, len(timeseries) + 1 - steps):
+
             # Add forecast target value(s)
             row = []
             for j in range(steps):
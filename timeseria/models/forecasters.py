@@ -1,21 +1,23 @@
 # -*- coding: utf-8 -*-
 """Forecasting models."""
 
-import copy
+from inspect import signature
 from ..datastructures import DataTimeSlot, TimePoint, DataTimePoint, Slot, Point
-from ..exceptions import NonContiguityError
-from ..utilities import get_periodicity, get_periodicity_index, set_from_t_and_to_t, item_is_in_range, mean_absolute_percentage_error
+from ..exceptions import NonContiguityError, NotFittedError
+from ..utilities import get_periodicity, get_periodicity_indexes, set_from_t_and_to_t, get_in_range_indexes, mean_absolute_percentage_error
+from ..utilities import check_resolution, check_data_labels
 from ..time import dt_from_s
 from ..units import Unit, TimeUnit
 from pandas import DataFrame
-from numpy import array
+from numpy import array, empty, ascontiguousarray, bincount, flatnonzero, float64, mean
+from numpy.lib.stride_tricks import sliding_window_view
 from math import sqrt
 
 # Sklearn
 from sklearn.metrics import mean_squared_error, mean_absolute_error
 
 # Base models and utilities
-from .base import TimeSeriesParametricModel, ProphetModel, ARIMAModel, KerasModel
+from .base import TimeSeriesParametricModel, PeriodicAverageModel, ProphetModel, ARIMAModel, KerasModel
 
 # Setup logging
 import logging
@@ -69,9 +71,67 @@ class Forecaster(TimeSeriesParametricModel):
         return super(Forecaster, self).predict(timeseries, steps, *args, **kwargs)
 
 
+    @property
+    def _supports_forecast_start(self):
+        # Whether the model predict logic can start forecasting from any item of the time series. It is looked up
+        # once per class (and not inherited from the parent ones, as they might have a different predict logic).
+        cls = self.__class__
+        if '_forecast_start_supported' not in cls.__dict__:
+            _predict = getattr(cls, '_predict', None)
+            if _predict is None:
+                cls._forecast_start_supported = False
+            else:
+                cls._forecast_start_supported = any(parameter.name == 'forecast_start' or parameter.kind == parameter.VAR_KEYWORD
+                                                    for parameter in signature(_predict).parameters.values())
+        return cls._forecast_start_supported
+
+    def _predict_one_step_ahead(self, timeseries, from_index, to_index):
+        """Get the one step-ahead predictions for the items from from_index to to_index (excluded) as an array, where
+        each item is predicted using only the items before it. Forecasters can override it to predict all at once."""
+
+        if not self.fitted:
+            raise NotFittedError()
+
+        # Nothing to predict if the time series has no items after the window
+        if to_index <= from_index:
+            return empty(0, dtype=float64)
+
+        key = self.data['data_labels'][0]
+        window = self.data['window']
+
+        predicteds = empty(to_index-from_index, dtype=float64)
+        supports_forecast_start = self._supports_forecast_start
+        window_timeseries = None
+        for j, i in enumerate(range(from_index, to_index)):
+            if supports_forecast_start:
+                # Use the optimized predict call (which just use the data as-is)
+                prediction = self.predict(timeseries, steps=1, forecast_start = i-1)
+
+            else:
+                # Otherwise, use a time series for the window. It is created only once and then rolled forward
+                # by one item at a time, as slicing the time series at every item would copy the entire window.
+                if not window_timeseries:
+                    window_timeseries = timeseries[i-window:i]
+                else:
+                    window_timeseries.pop(0)
+                    window_timeseries.append(timeseries[i-1])
+                prediction = self.predict(window_timeseries, steps=1)
+
+            # TODO: this is because of forecasters not supporting multi-step forecasts.
+            if not isinstance(prediction, list):
+                predicteds[j] = prediction[key]
+            else:
+                predicteds[j] = prediction[0][key]
+
+        return predicteds
+
+
     def forecast(self, timeseries, steps=1, forecast_start=None):
         """Forecast n steps-ahead full data points or slots"""
 
+        if not self.fitted:
+            raise NotFittedError()
+
         # Set forecast starting item
         if forecast_start is not None:
             forecast_start_item = timeseries[forecast_start]
@@ -80,23 +140,22 @@ class Forecaster(TimeSeriesParametricModel):
             
         # Handle forecast start
         if forecast_start is not None:
-            try:
-                predicted_data = self.predict(timeseries=timeseries, steps=steps, forecast_start=forecast_start)
-            except TypeError as e:
-                if 'unexpected keyword argument' and  'forecast_start' in str(e):
-                    raise NotImplementedError('The model does not support the "forecast_start" parameter, cannot proceed')           
-                else:
-                    raise
+            if not self._supports_forecast_start:
+                raise NotImplementedError('The model does not support the "forecast_start" parameter, cannot proceed')
+            predicted_data = self.predict(timeseries=timeseries, steps=steps, forecast_start=forecast_start)
         else:
             predicted_data = self.predict(timeseries=timeseries, steps=steps)
                 
+        # Check the item type only once
+        is_slot_series = isinstance(timeseries[0], Slot)
+
         # List of predictions or single prediction?
         if isinstance(predicted_data,list):
             forecast = []
             last_item = forecast_start_item
             for data in predicted_data:
 
-                if isinstance(timeseries[0], Slot):
+                if is_slot_series:
                     forecast.append(DataTimeSlot(start = last_item.end,
                                                  unit  = timeseries.resolution,
                                                  data_loss = None,
@@ -108,7 +167,7 @@ class Forecaster(TimeSeriesParametricModel):
                                                   data  = data))
                 last_item = forecast[-1]
         else:
-            if isinstance(timeseries[0], Slot):
+            if is_slot_series:
                 forecast = DataTimeSlot(start = forecast_start_item.end,
                                         unit  = timeseries.resolution,
                                         data_loss = None,
@@ -197,6 +256,163 @@ class Forecaster(TimeSeriesParametricModel):
         """
         return super(Forecaster, self).evaluate(timeseries, steps, limit, plots, plot, metrics, details, from_t, to_t, from_dt, to_dt, evaluation_timeseries)
 
+    def _evaluate_steps_round(self, timeseries, steps_round, limit=None, plots=False, in_range_indexes=None, warned=False):
+        """Get the real and model values for a given steps-ahead evaluation round, and if the long time series warning was issued."""
+
+        if in_range_indexes is None:
+            in_range_indexes = range(len(timeseries))
+
+        # Support vars
+        processed_samples = 0
+
+        # Check the time series and item types only once, and not for every item of every window
+        timeseries_class = timeseries.__class__
+        item_class = timeseries[0].__class__
+        is_point_series = isinstance(timeseries[0], Point)
+        is_slot_series = isinstance(timeseries[0], Slot)
+
+        key = timeseries.data_labels()[0]
+
+        # The model window, used for every evaluated item
+        window = self.data['window']
+        
+        # If the model has no window, evaluate on the entire time series
+        if not window:
+
+            # Note: steps_round is always equal to the entire test time series length in window-less model evaluation
+
+            # Create a time series where to apply the forecast, with only a point "in the past",
+            # this is done in order to use the apply function as is. Since the model is not using
+            # any window, the point data will be ignored and just used for its timestamp
+            forecast_timeseries = timeseries.__class__()
+            
+            # TODO: it should not be required to check .resolution type!
+            if isinstance(timeseries[0], Point):
+                if isinstance(timeseries.resolution, TimeUnit):
+                    forecast_timeseries.append(timeseries[0].__class__(dt = timeseries[0].dt - timeseries.resolution,
+                                                                       data = timeseries[0].data))                            
+                elif isinstance(timeseries.resolution, Unit):
+                    forecast_timeseries.append(timeseries[0].__class__(dt = dt_from_s(timeseries[0].t - timeseries.resolution.value, tz=timeseries[0].tz),
+                                                                       data = timeseries[0].data))
+                else:
+                    forecast_timeseries.append(timeseries[0].__class__(dt = dt_from_s(timeseries[0].t - timeseries.resolution, tz=timeseries[0].tz),
+                                                                       data = timeseries[0].data))                    
+            elif isinstance(timeseries[0], Slot):
+                if isinstance(timeseries.resolution, TimeUnit):
+                    forecast_timeseries.append(timeseries[0].__class__(dt = timeseries[0].dt - timeseries.resolution,
+                                                                       unit = timeseries.resolution,
+                                                                       data = timeseries[0].data))                            
+                elif isinstance(timeseries.resolution, Unit):
+                    forecast_timeseries.append(timeseries[0].__class__(dt = dt_from_s(timeseries[0].t - timeseries.resolution.value, tz=timeseries[0].tz),
+                                                                       unit = timeseries.resolution,
+                                                                       data = timeseries[0].data))
+                else:
+                    forecast_timeseries.append(timeseries[0].__class__(dt = dt_from_s(timeseries[0].t - timeseries.resolution, tz=timeseries[0].tz),
+                                                                       unit = timeseries.resolution,
+                                                                       data = timeseries[0].data))
+            else:
+                raise TypeError('Unknown time series items type (got "{}"'.format(timeseries[0].__class__.__name__))
+
+            # Set default evaluate samples
+            evaluate_samples = len(timeseries)
+            
+            # Do we have a limit on the evaluate sample to apply?
+            if limit:
+                if limit < evaluate_samples:
+                    evaluate_samples = limit
+            
+            # Warn if no limit given and we are over
+            if not limit and not warned and evaluate_samples > 10000:
+                logger.warning('No limit set in the evaluation with a quite long time series, this could take some time.')
+                warned=True
+            
+            # All evaluation samples will be processed
+            processed_samples = evaluate_samples
+
+            # Apply the forecasting model with a length equal to the original series minus the first element
+            self._apply(forecast_timeseries, steps=evaluate_samples, inplace=True)
+
+            # Save the model and the original value to be compared later on. Create the arrays by skipping the fist item
+            # and move through the forecast time series comparing with the input time series, shifted by one since in the
+            # forecast timeseries we added an "artificial" first point to use the apply()
+            model_values = array([forecast_timeseries[i].data[key] for i in range(1, evaluate_samples+1)], dtype=float64)
+            real_values = array([timeseries[i-1].data[key] for i in range(1, evaluate_samples+1)], dtype=float64)
+
+
+        # Else, process in streaming the timeseries, item by item, and properly take into account the window.
+        else:
+            
+            # Only process the items for which we can get enough data
+            min_index = window
+            max_index = len(timeseries) - steps_round
+            if isinstance(in_range_indexes, range):
+                indexes = range(max(in_range_indexes.start, min_index), min(in_range_indexes.stop, max_index+1))
+            else:
+                indexes = [i for i in in_range_indexes if min_index <= i <= max_index]
+
+            # Preallocate the model and real values, for the (maximum) number of samples to process
+            samples = min(len(indexes), limit) if limit else len(indexes)
+            model_values = empty(samples*steps_round, dtype=float64)
+            real_values = empty(samples*steps_round, dtype=float64)
+            
+            for i in indexes:
+                
+                # Compute the various boundaries
+                original_timeseries_boundaries_start = i - window
+                original_timeseries_boundaries_end = i + steps_round
+                
+                original_forecast_timeseries_boundaries_start = original_timeseries_boundaries_start
+                original_forecast_timeseries_boundaries_end = original_timeseries_boundaries_end-steps_round
+                
+                # Create the time series where to apply the forecast
+                forecast_timeseries = timeseries_class()
+                for j in range(original_forecast_timeseries_boundaries_start, original_forecast_timeseries_boundaries_end):
+
+                    if is_point_series:
+                        forecast_timeseries.append(item_class(t = timeseries[j].t,
+                                                              tz = timeseries[j].tz,
+                                                              data = timeseries[j].data))                        
+                    elif is_slot_series:
+                        forecast_timeseries.append(item_class(start = timeseries[j].start,
+                                                              end   = timeseries[j].end,
+                                                              unit  = timeseries[j].unit,
+                                                              data  = timeseries[j].data))                           
+                    
+                    # This would lead to add the forecasted index to the original data (and we don't want it)
+                    #forecast_timeseries.append(timeseries[j])
+
+                # Apply the forecasting model
+                self._apply(forecast_timeseries, steps=steps_round, inplace=True)
+
+                # Plot results time series?
+                if plots:
+                    forecast_timeseries.plot()
+                
+                # Save the model and the original value to be compared later on
+                for step in range(steps_round):
+                    original_index = original_timeseries_boundaries_start + window + step
+
+                    forecast_index = window + step
+
+                    model_values[processed_samples*steps_round+step] = forecast_timeseries[forecast_index].data[key]
+                    real_values[processed_samples*steps_round+step] = timeseries[original_index].data[key]
+
+                processed_samples+=1
+                if limit is not None and processed_samples >= limit:
+                    break
+                
+                # Warn if no limit given and we are over
+                if not limit and not warned and i > 10000:
+                    logger.warning('No limit set in the evaluation with a quite long time series, this could take some time.')
+                    warned=True
+
+            # Only keep the values of the processed samples
+            model_values = model_values[:processed_samples*steps_round]
+            real_values = real_values[:processed_samples*steps_round]
+
+        return real_values, model_values, processed_samples, warned
+
+
     def _evaluate(self, timeseries, steps='auto', limit=None, plots=False, plot=False, metrics=['RMSE', 'MAE'], details=False, from_t=None, to_t=None, from_dt=None, to_dt=None, evaluation_timeseries=False):
 
         if len(timeseries.data_labels()) > 1:
@@ -246,210 +462,55 @@ class Forecaster(TimeSeriesParametricModel):
         # Support vars
         results = {}
         from_t, to_t = set_from_t_and_to_t(from_dt, to_dt, from_t, to_t)
-        warned = False
+        in_range_indexes = get_in_range_indexes(timeseries, from_t, to_t)
 
         # Log
         logger.info('Will evaluate model for %s steps ahead with metrics %s', steps, metrics)
 
+        # Evaluate all the steps rounds, warning only once about long time series
+        steps_rounds_values = []
+        warned = False
         for steps_round in steps:
-            
-            # Support vars
-            real_values = []
-            model_values = []
-            processed_samples = 0
-    
-            for key in timeseries.data_labels():
-                
-                # If the model has no window, evaluate on the entire time series
-                if not self.data['window']:
+            real_values, model_values, processed_samples, warned = self._evaluate_steps_round(timeseries, steps_round, limit=limit, plots=plots,
+                                                                                              in_range_indexes=in_range_indexes, warned=warned)
+            steps_rounds_values.append((real_values, model_values, processed_samples))
+
+        key = timeseries.data_labels()[0]
+
+        for steps_round, (real_values, model_values, processed_samples) in zip(steps, steps_rounds_values):
 
-                    # Note: steps_round is always equal to the entire test time series length in window-less model evaluation
-     
-                    # Create a time series where to apply the forecast, with only a point "in the past",
-                    # this is done in order to use the apply function as is. Since the model is not using
-                    # any window, the point data will be ignored and just used for its timestamp
-                    forecast_timeseries = timeseries.__class__()
-                    
-                    # TODO: it should not be required to check .resolution type!
-                    if isinstance(timeseries[0], Point):
-                        if isinstance(timeseries.resolution, TimeUnit):
-                            forecast_timeseries.append(timeseries[0].__class__(dt = timeseries[0].dt - timeseries.resolution,
-                                                                               data = timeseries[0].data))                            
-                        elif isinstance(timeseries.resolution, Unit):
-                            forecast_timeseries.append(timeseries[0].__class__(dt = dt_from_s(timeseries[0].t - timeseries.resolution.value, tz=timeseries[0].tz),
-                                                                               data = timeseries[0].data))
-                        else:
-                            forecast_timeseries.append(timeseries[0].__class__(dt = dt_from_s(timeseries[0].t - timeseries.resolution, tz=timeseries[0].tz),
-                                                                               data = timeseries[0].data))                    
-                    elif isinstance(timeseries[0], Slot):
-                        if isinstance(timeseries.resolution, TimeUnit):
-                            forecast_timeseries.append(timeseries[0].__class__(dt = timeseries[0].dt - timeseries.resolution,
-                                                                               unit = timeseries.resolution,
-                                                                               data = timeseries[0].data))                            
-                        elif isinstance(timeseries.resolution, Unit):
-                            forecast_timeseries.append(timeseries[0].__class__(dt = dt_from_s(timeseries[0].t - timeseries.resolution.value, tz=timeseries[0].tz),
-                                                                               unit = timeseries.resolution,
-                                                                               data = timeseries[0].data))
-                        else:
-                            forecast_timeseries.append(timeseries[0].__class__(dt = dt_from_s(timeseries[0].t - timeseries.resolution, tz=timeseries[0].tz),
-                                                                               unit = timeseries.resolution,
-                                                                               data = timeseries[0].data))
-                    else:
-                        raise TypeError('Unknown time series items type (got "{}"'.format(timeseries[0].__class__.__name__))
-
-                    # Set default evaluate samples
-                    evaluate_samples = len(timeseries)
-                    
-                    # Do we have a limit on the evaluate sample to apply?
-                    if limit:
-                        if limit < evaluate_samples:
-                            evaluate_samples = limit
-                    
-                    # Warn if no limit given and we are over
-                    if not limit and evaluate_samples > 10000:
-                        logger.warning('No limit set in the evaluation with a quite long time series, this could take some time.')
-                        warned=True
-                    
-                    # All evaluation samples will be processed
-                    processed_samples = evaluate_samples
-             
-                    # Apply the forecasting model with a length equal to the original series minus the first element
-                    self._apply(forecast_timeseries, steps=evaluate_samples, inplace=True)
-
-                    # Save the model and the original value to be compared later on. Create the arrays by skipping the fist item
-                    # and move through the forecast time series comparing with the input time series, shifted by one since in the
-                    # forecast timeseries we added an "artificial" first point to use the apply()
-                    for i in range(1, evaluate_samples+1):
-                        
-                        model_value = forecast_timeseries[i].data[key]
-                        model_values.append(model_value)
-                        
-                        real_value = timeseries[i-1].data[key]
-                        real_values.append(real_value)
-
-
-                # Else, process in streaming the timeseries, item by item, and properly take into account the window.
-                else:
-                    for i in range(len(timeseries)):
-    
-                        # Skip if needed
-                        try:
-                            if not item_is_in_range(timeseries[i], from_t, to_t):
-                                continue
-                        except StopIteration:
-                            break  
-                    
-                        # Check that we can get enough data
-                        if i < self.data['window']:
-                            continue
-                        if i > (len(timeseries)-steps_round):
-                            continue
-                        
-                        # Compute the various boundaries
-                        original_timeseries_boundaries_start = i - (self.data['window']) 
-                        original_timeseries_boundaries_end = i + steps_round
-                        
-                        original_forecast_timeseries_boundaries_start = original_timeseries_boundaries_start
-                        original_forecast_timeseries_boundaries_end = original_timeseries_boundaries_end-steps_round
-                        
-                        # Create the time series where to apply the forecast
-                        forecast_timeseries = timeseries.__class__()
-                        for j in range(original_forecast_timeseries_boundaries_start, original_forecast_timeseries_boundaries_end):
-
-                            if isinstance(timeseries[0], Point):
-                                forecast_timeseries.append(timeseries[0].__class__(t = timeseries[j].t,
-                                                                                   tz = timeseries[j].tz,
-                                                                                   data = timeseries[j].data))                        
-                            elif isinstance(timeseries[0], Slot):
-                                forecast_timeseries.append(timeseries[0].__class__(start = timeseries[j].start,
-                                                                                   end   = timeseries[j].end,
-                                                                                   unit  = timeseries[j].unit,
-                                                                                   data  = timeseries[j].data))                           
-                            
-                            # This would lead to add the forecasted index to the original data (and we don't want it)
-                            #forecast_timeseries.append(timeseries[j])
-     
-                        # Apply the forecasting model
-                        self._apply(forecast_timeseries, steps=steps_round, inplace=True)
-    
-                        # Plot results time series?
-                        if plots:
-                            forecast_timeseries.plot()
-                        
-                        # Save the model and the original value to be compared later on
-                        for step in range(steps_round):
-                            original_index = original_timeseries_boundaries_start + self.data['window'] + step
-    
-                            forecast_index = self.data['window'] + step
-    
-                            model_value = forecast_timeseries[forecast_index].data[key]
-                            model_values.append(model_value)
-                            
-                            real_value = timeseries[original_index].data[key]
-                            real_values.append(real_value)
-     
-                        processed_samples+=1
-                        if limit is not None and processed_samples >= limit:
-                            break
-                        
-                        # Warn if no limit given and we are over
-                        if not limit and not warned and i > 10000:
-                            logger.warning('No limit set in the evaluation with a quite long time series, this could take some time.')
-                            warned=True
-                    
             if limit is not None and processed_samples < limit:
                 logger.warning('The evaluation limit is set to "{}" but I have only "{}" samples for "{}" steps'.format(limit, processed_samples, steps_round))
 
-            if not model_values:
+            if not len(model_values):
                 raise Exception('Could not evaluate model, maybe not enough data?')
 
+            # Ensure contiguous float arrays, so that the metrics do not have to validate and convert the values
+            real_values = ascontiguousarray(real_values, dtype=float64)
+            model_values = ascontiguousarray(model_values, dtype=float64)
+            AEs = abs(real_values - model_values)
+
             # Compute RMSE and ME, and add to the results
             if 'RMSE' in metrics:
                 results['RMSE_{}_steps'.format(steps_round)] = sqrt(mean_squared_error(real_values, model_values))
             if 'MAE' in metrics:
                 results['MAE_{}_steps'.format(steps_round)] = mean_absolute_error(real_values, model_values)
                 if evaluation_timeseries:
-                    for i in range(len(model_values)):
-                        evaluation_timeseries[i].data['{}_AE'.format(key)] = abs(real_values[i] - model_values[i])  
+                    for i, AE in enumerate(AEs.tolist()):
+                        evaluation_timeseries[i].data['{}_AE'.format(key)] = AE
             if 'MAPE' in metrics:
                 results['MAPE_{}_steps'.format(steps_round)] = mean_absolute_percentage_error(real_values, model_values)
                 if evaluation_timeseries:
-                    for i in range(len(model_values)):
-                        evaluation_timeseries[i].data['{}_APE'.format(key)] = abs(real_values[i] - model_values[i]) / real_values[i]
+                    for i, APE in enumerate(abs(AEs / real_values).tolist()):
+                        evaluation_timeseries[i].data['{}_APE'.format(key)] = APE
             
             if evaluation_timeseries:
-                for i in range(len(model_values)):
-                    evaluation_timeseries[i].data['{}_pred'.format(key)] = model_values[i]
-        
-        # Compute overall RMSE
-        if 'RMSE' in metrics:
-            sum_rmse = 0
-            count = 0
-            for key in results:
-                if key.startswith('RMSE_'):
-                    sum_rmse += results[key]
-                    count += 1
-            results['RMSE'] = sum_rmse/count
-
-        # Compute overall MAE
-        if 'MAE' in metrics:
-            sum_me = 0
-            count = 0
-            for key in results:
-                if key.startswith('MAE_'):
-                    sum_me += results[key]
-                    count += 1
-            results['MAE'] = sum_me/count
-
-        # Compute overall MAPE
-        if 'MAPE' in metrics:
-            sum_me = 0
-            count = 0
-            for key in results:
-                if key.startswith('MAPE_'):
-                    sum_me += results[key]
-                    count += 1
-            results['MAPE'] = sum_me/count
+                for i, model_value in enumerate(model_values.tolist()):
+                    evaluation_timeseries[i].data['{}_pred'.format(key)] = model_value
+        
+        # Compute the overall metrics, as the average over all the steps rounds
+        for metric in metrics:
+            results[metric] = float(mean([value for label, value in results.items() if label.startswith(metric+'_')]))
         
         if not details:
             simple_results = {}
@@ -480,7 +541,7 @@ class Forecaster(TimeSeriesParametricModel):
 #  P. Average Forecaster
 #=========================
 
-class PeriodicAverageForecaster(Forecaster):
+class PeriodicAverageForecaster(Forecaster, PeriodicAverageModel):
     """A forecaster based on periodic averages.
     
     Args:
@@ -501,10 +562,10 @@ class PeriodicAverageForecaster(Forecaster):
         # Call parent init        
         super(PeriodicAverageForecaster, self).__init__(path=path)
 
-        # If loaded (fitted), convert the average dict keys back to integers
+        # If loaded (fitted), convert the average dict keys back to integers and set the averages lookup array
         if self.fitted:
             self.data['averages'] = {int(key):value for key, value in self.data['averages'].items()}
-        
+            self._set_averages_array()
 
     def fit(self, timeseries, periodicity='auto', dst_affected=False, from_t=None, to_t=None, from_dt=None, to_dt=None):
         """Fit the forecaster on a time series.
@@ -541,33 +602,25 @@ class PeriodicAverageForecaster(Forecaster):
             logger.info('Using a window of "{}"'.format(periodicity))
             self.data['window'] = periodicity
 
-        for key in timeseries.data_labels():
-            sums   = {}
-            totals = {}
-            processed = 0
-            for item in timeseries:
-
-                # Skip if needed
-                try:
-                    if not item_is_in_range(item, from_t, to_t):
-                        continue                  
-                except StopIteration:
-                    break
-                
-                # Process
-                periodicity_index = get_periodicity_index(item, timeseries.resolution, periodicity, dst_affected)
-                if not periodicity_index in sums:
-                    sums[periodicity_index] = item.data[key]
-                    totals[periodicity_index] = 1
-                else:
-                    sums[periodicity_index] += item.data[key]
-                    totals[periodicity_index] +=1
-                processed += 1
+        key = timeseries.data_labels()[0]
+
+        # Get the items in range, and their values and periodicity indexes as arrays
+        items = [timeseries[i] for i in get_in_range_indexes(timeseries, from_t, to_t)]
+        values = array([item.data[key] for item in items], dtype=float)
+        periodicity_indexes = get_periodicity_indexes(items, timeseries.resolution, periodicity, dst_affected=dst_affected)
+        processed = len(items)
 
+        # Periodicity indexes are in the [0, periodicity) range, so sums and totals can be accumulated
+        # in two fixed-size arrays indexed by them, all at once, instead of in two dicts.
+        sums = bincount(periodicity_indexes, weights=values, minlength=periodicity)
+        totals = bincount(periodicity_indexes, minlength=periodicity)
+
+        # Only the periodicity indexes which actually had items have an average
         averages={}
-        for periodicity_index in sums:
-            averages[periodicity_index] = sums[periodicity_index]/totals[periodicity_index]
+        for periodicity_index in flatnonzero(totals).tolist():
+            averages[periodicity_index] = float(sums[periodicity_index]/totals[periodicity_index])
         self.data['averages'] = averages
+        self._set_averages_array()
         
         logger.debug('Processed %s items', processed)
 
@@ -586,53 +639,67 @@ class PeriodicAverageForecaster(Forecaster):
         # Get forecast start item
         forecast_start_item = timeseries[forecast_start]
 
-        # Support vars
-        forecast_timestamps = []
-        forecast_data = []
+        window = self.data['window']
+        periodicity = self.data['periodicity']
+        dst_affected = self.data['dst_affected']
+        resolution = timeseries.resolution
 
         # Compute the offset (avg diff between the real values and the forecasts on the first window)
-        diffs  = 0                
-        for j in range(self.data['window']):
-            serie_index = forecast_start - self.data['window'] + j
-            real_value = timeseries[serie_index].data[key]
-            forecast_value = self.data['averages'][get_periodicity_index(timeseries[serie_index], timeseries.resolution, self.data['periodicity'], dst_affected=self.data['dst_affected'])]
-            diffs += (real_value - forecast_value)            
+        window_items = [timeseries[j] for j in range(forecast_start - window, forecast_start)]
+        real_values = array([item.data[key] for item in window_items], dtype=float64)
+        diffs = real_values - self._get_averages(get_periodicity_indexes(window_items, resolution, periodicity, dst_affected=dst_affected))
 
         # Sum the avg diff between the real and the forecast on the window to the forecast (the offset)
-        offset = diffs/j
+        offset = float(diffs.mean())
 
-        # Perform the forecast
-        for i in range(steps):
-            step = i + 1
-
-            # Set forecast timestamp
-            if isinstance(timeseries[0], Slot):
-                try:
-                    forecast_timestamp = forecast_timestamps[-1] + timeseries.resolution
-                    forecast_timestamps.append(forecast_timestamp)
-                except IndexError:
-                    forecast_timestamp = forecast_start_item.end
-                    forecast_timestamps.append(forecast_timestamp)
+        # Set the forecast timestamps
+        if isinstance(timeseries[0], Slot):
+            forecast_timestamps = [forecast_start_item.end]
+            for _ in range(steps-1):
+                forecast_timestamps.append(forecast_timestamps[-1] + resolution)
+        else:
+            forecast_timestamps = [TimePoint(t = forecast_start_item.t + (resolution.as_seconds()*step), tz = forecast_start_item.tz) for step in range(1, steps+1)]
 
-            else:
-                forecast_timestamp = TimePoint(t = forecast_start_item.t + (timeseries.resolution.as_seconds()*step), tz = forecast_start_item.tz )
-    
-            # Compute the real forecast data
-            periodicity_index = get_periodicity_index(forecast_timestamp, timeseries.resolution, self.data['periodicity'], dst_affected=self.data['dst_affected'])        
-            forecast_data.append({key: self.data['averages'][periodicity_index] + (offset*1.0)})
+        # Perform the forecast, for all the steps at once
+        forecast_values = self._get_averages(get_periodicity_indexes(forecast_timestamps, resolution, periodicity, dst_affected=dst_affected)) + offset
+        forecast_data = [{key: forecast_value} for forecast_value in forecast_values.tolist()]
         
         # Return
         return forecast_data
 
     
-    def _plot_averages(self, timeseries, **kwargs):      
-        averages_timeseries = copy.deepcopy(timeseries)
-        for item in averages_timeseries:
-            value = self.data['averages'][get_periodicity_index(item, averages_timeseries.resolution, self.data['periodicity'], dst_affected=self.data['dst_affected'])]
-            if not value:
-                value = 0
-            item.data['periodic_average'] =value 
-        averages_timeseries.plot(**kwargs)
+    def _predict_one_step_ahead(self, timeseries, from_index, to_index):
+
+        # Same checks as the predict(), which is not called here
+        if not self.fitted:
+            raise NotFittedError()
+        check_resolution(timeseries, self.data['resolution'])
+        check_data_labels(timeseries, self.data['data_labels'])
+
+        key = self.data['data_labels'][0]
+        window = self.data['window']
+        periodicity = self.data['periodicity']
+        resolution = timeseries.resolution
+        if from_index < window+1:
+            raise ValueError('Cannot predict items before the model window plus one (got from_index={})'.format(from_index))
+        if to_index <= from_index:
+            return empty(0, dtype=float64)
+
+        # Diffs between the real values and the averages of the items used for the offsets, and their sums over each window.
+        # The prediction for the i-th item uses as window the items from i-1-window to i-2, same as in the predict().
+        items = [timeseries[k] for k in range(from_index-1-window, to_index-2)]
+        real_values = array([item.data[key] for item in items], dtype=float64)
+        diffs = real_values - self._get_averages(get_periodicity_indexes(items, resolution, periodicity, dst_affected=self.data['dst_affected']))
+        offsets = sliding_window_view(diffs, window).sum(axis=1) / window
+
+        # Forecast timestamps, which are the end of the previous slot or the previous point plus the resolution
+        if isinstance(timeseries[0], Slot):
+            forecast_timestamps = [timeseries[i-1].end for i in range(from_index, to_index)]
+        else:
+            resolution_s = resolution.as_seconds()
+            forecast_timestamps = [TimePoint(t = timeseries[i-1].t + resolution_s, tz = timeseries[i-1].tz) for i in range(from_index, to_index)]
+        
+        return self._get_averages(get_periodicity_indexes(forecast_timestamps, resolution, periodicity, dst_affected=self.data['dst_affected'])) + offsets
 
 
 
@@ -695,19 +762,17 @@ class ProphetForecaster(Forecaster, ProphetModel):
         
         for _ in range(steps):
             new_item_dt = last_item_dt + timeseries.resolution
-            data_to_forecast.append(self._remove_timezone(new_item_dt))
+            data_to_forecast.append(new_item_dt)
             last_item_dt = new_item_dt
 
-        dataframe_to_forecast = DataFrame(data_to_forecast, columns = ['ds'])
+        dataframe_to_forecast = DataFrame({'ds': self._ds_array(data_to_forecast)})
                     
         # Call Prophet predict 
         forecast = self.prophet_model.predict(dataframe_to_forecast)
         #forecast[['ds', 'yhat', 'yhat_lower', 'yhat_upper']].tail()
             
-        # Re arrange predict results
-        forecasted_items = []
-        for i in range(steps):
-            forecasted_items.append({key: float(forecast['yhat'][i])})
+        # Re arrange predict results (getting them all at once from the dataframe)
+        forecasted_items = [{key: forecasted_value} for forecasted_value in forecast['yhat'].to_numpy().tolist()]
 
         # Return
         return forecasted_items      
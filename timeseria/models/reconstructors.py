@@ -1,13 +1,13 @@
 # -*- coding: utf-8 -*-
 """Data reconstructions models."""
 
-import copy
 import statistics
-from ..utilities import get_periodicity, get_periodicity_index, set_from_t_and_to_t, item_is_in_range, mean_absolute_percentage_error
-from ..time import dt_from_s
+from ..utilities import get_periodicity, get_periodicity_indexes, set_from_t_and_to_t, get_in_range_indexes, mean_absolute_percentage_error
 from sklearn.metrics import mean_absolute_error, mean_squared_error
 from ..units import TimeUnit
 from pandas import DataFrame
+from numpy import array, arange, empty, zeros, concatenate, diff, flatnonzero, bincount, int8, nan, mean
+from numpy.lib.stride_tricks import sliding_window_view
 from math import sqrt
 
 # Setup logging
@@ -22,7 +22,7 @@ except (ImportError,AttributeError):
     pass
 
 # Base models and utilities
-from .base import TimeSeriesParametricModel, ProphetModel
+from .base import TimeSeriesParametricModel, PeriodicAverageModel, ProphetModel
 
 
 #=========================
@@ -45,6 +45,12 @@ class Reconstructor(TimeSeriesParametricModel):
         raise NotImplementedError('Reconstructors can be used only from the apply() method.') from None
 
 
+    @staticmethod
+    def _get_data_losses(timeseries):
+        # Get the data losses of all the items as an array. Missing data losses are set to NaN, so
+        # that they never compare greater than or equal to (nor less than) any threshold.
+        return array([item.data_loss if item.data_loss is not None else nan for item in timeseries], dtype=float)
+
     def _apply(self, timeseries, remove_data_loss=False, data_loss_threshold=1, inplace=False):
         logger.debug('Using data_loss_threshold="%s"', data_loss_threshold)
 
@@ -62,44 +68,26 @@ class Reconstructor(TimeSeriesParametricModel):
         if len(timeseries.data_labels()) > 1:
             raise NotImplementedError('Multivariate time series are not yet supported')
 
-        for key in timeseries.data_labels():
-            
-            gap_started = None
-            
-            for i, item in enumerate(timeseries):
-                
-                # Skip if before from_t/dt of after to_t/dt
-                if from_t is not None and timeseries[i].t < from_t:
-                    continue
-                try:
-                    # Handle slots
-                    if to_t is not None and timeseries[i].end.t > to_t:
-                        break
-                except AttributeError:
-                    # Handle points
-                    if to_t is not None and timeseries[i].t > to_t:
-                        break                
-
-                if item.data_loss is not None and item.data_loss >= data_loss_threshold:
-                    # This is the beginning of an area we want to reconstruct according to the data_loss_threshold
-                    if gap_started is None:
-                        gap_started = i
-                else:
-                    
-                    if gap_started is not None:
-                    
-                        # Reconstruct for this gap
-                        self._reconstruct(from_index=gap_started, to_index=i, timeseries=timeseries, key=key)
-                        gap_started = None
-                    
-                    item.data_indexes['data_reconstructed'] = 0
-                    
-                if remove_data_loss:
-                    item.data_indexes.pop('data_loss', None)
-            
-            # Reconstruct the last gap as well if left "open"
-            if gap_started is not None:
-                self._reconstruct(from_index=gap_started, to_index=i+1, timeseries=timeseries, key=key)
+        key = timeseries.data_labels()[0]
+        
+        # Find the gaps, intended as areas we want to reconstruct according to the data_loss_threshold. Only the items in range can be part of a gap.
+        in_range_indexes = array(get_in_range_indexes(timeseries, from_t, to_t), dtype=int)
+        data_losses = self._get_data_losses(timeseries)
+        gap_items = zeros(len(timeseries), dtype=bool)
+        gap_items[in_range_indexes] = data_losses[in_range_indexes] >= data_loss_threshold
+
+        # The gaps start and end where the gap items mask changes, and they alternate (with a padding to close them at the edges)
+        gap_edges = flatnonzero(diff(concatenate(([False], gap_items, [False])).astype(int8)))
+        gaps = zip(gap_edges[0::2].tolist(), gap_edges[1::2].tolist())
+
+        # Mark all the items as not reconstructed in one go, then reconstruct the gaps (which marks their items as reconstructed)
+        for item in timeseries:
+            item.data_indexes['data_reconstructed'] = 0
+        self._reconstruct_gaps(timeseries, key, gaps)
+
+        # Remove the data loss index if required, also in one go
+        if remove_data_loss:
+            timeseries.remove_data_loss()
 
         if not inplace:
             return timeseries
@@ -129,6 +117,9 @@ class Reconstructor(TimeSeriesParametricModel):
 
     def _evaluate(self, timeseries, steps='auto', limit=None, data_loss_threshold=1, metrics=['RMSE', 'MAE'], details=False, from_t=None, to_t=None, from_dt=None, to_dt=None):
 
+        if len(timeseries.data_labels()) > 1:
+            raise NotImplementedError('Multivariate time series are not yet supported')
+
         # Set evaluation_score steps if we have to
         if steps == 'auto':
             try:
@@ -147,137 +138,104 @@ class Reconstructor(TimeSeriesParametricModel):
         
         # Log
         logger.info('Will evaluate model for %s steps with metrics %s', steps, metrics)
+
+        # Get the in-range indexes, and which items are usable for the evaluation as not affected by data loss
+        in_range_indexes = array(get_in_range_indexes(timeseries, from_t, to_t), dtype=int)
+        data_losses = self._get_data_losses(timeseries)
+        good_items = ~(data_losses >= data_loss_threshold)
+
+        # The time series class, to create the time series to reconstruct
+        timeseries_class = timeseries.__class__
         
-        # Find areas where to evaluate the model
-        for key in timeseries.data_labels():
-             
-            for steps_round in steps:
-                
-                # Support vars
-                real_values = []
-                reconstructed_values = []
-                processed_samples = 0
+        key = timeseries.data_labels()[0]
 
-                # Here we will have steps=1, steps=2 .. steps=n          
-                logger.debug('Evaluating model for %s steps', steps_round)
+        # Get all the values at once
+        values = array([item.data[key] for item in timeseries], dtype=float)
+         
+        for steps_round in steps:
+            
+            # Support vars
+            processed_samples = 0
+
+            # Here we will have steps=1, steps=2 .. steps=n          
+            logger.debug('Evaluating model for %s steps', steps_round)
+
+            # Get the "good areas" where to test: we skip the first and the last ones, and reconstruct the ones in the
+            # middle. The i-th item can be used if all the items from i-1 to i+steps_round are not affected by data loss.
+            if len(timeseries) < steps_round+2:
+                evaluation_indexes = array([], dtype=int)
+            else:
+                good_areas = sliding_window_view(good_items, steps_round+2).all(axis=-1)
+                candidate_indexes = in_range_indexes[(in_range_indexes >= 1) & (in_range_indexes < len(timeseries)-steps_round)]
+                evaluation_indexes = candidate_indexes[good_areas[candidate_indexes-1]]
+                if limit is not None:
+                    evaluation_indexes = evaluation_indexes[:limit]
+            
+            # Get the real values all at once, and preallocate the reconstructed values
+            real_values = values[(evaluation_indexes[:, None] + arange(steps_round)).ravel()]
+            reconstructed_values = empty(len(real_values), dtype=float)
+            
+            for i in evaluation_indexes.tolist():
+                        
+                # Set prev and next
+                prev_value = values[i-1]
+                next_value = values[i+steps_round]
                 
-                for i in range(len(timeseries)):
-
-                    # Skip if needed
-                    try:
-                        if not item_is_in_range(timeseries[i], from_t, to_t):
-                            continue
-                    except StopIteration:
-                        break                  
+                # Compute average value
+                average_value = float(prev_value+next_value)/2
                 
-                    # Skip the first and the last ones, otherwise reconstruct the ones in the middle
-                    if (i == 0) or (i >= len(timeseries)-steps_round):
-                        continue
-
-                    # Is this a "good area" where to test or do we have to stop?
-                    stop = False
-                    if timeseries[i-1].data_loss is not None and timeseries[i-1].data_loss >= data_loss_threshold:
-                        stop = True
-                    for j in range(steps_round):
-                        if timeseries[i+j].data_loss is not None and timeseries[i+j].data_loss >= data_loss_threshold:
-                            stop = True
-                            break
-                    if timeseries[i+steps_round].data_loss is not None and timeseries[i+steps_round].data_loss >= data_loss_threshold:
-                        stop = True
-                    if stop:
-                        continue
-                            
-                    # Set prev and next
-                    prev_value = timeseries[i-1].data[key]
-                    next_value = timeseries[i+steps_round].data[key]
-                    
-                    # Compute average value
-                    average_value = (prev_value+next_value)/2
-                    
-                    # Data to be reconstructed
-                    timeseries_to_reconstruct = timeseries.__class__()
-                    
-                    # Append prev
-                    #timeseries_to_reconstruct.append(copy.deepcopy(timeseries[i-1]))
-                    
-                    # Append in the middle and store real values
-                    for j in range(steps_round):
-                        item = copy.deepcopy(timeseries[i+j])
-                        # Set the data_loss to one so the item will be reconstructed
-                        item.data_indexes['data_loss'] = 1
-                        item.data[key] = average_value
-                        timeseries_to_reconstruct.append(item)
-                        
-                        real_values.append(timeseries[i+j].data[key])
-              
-                    # Append next
-                    #timeseries_to_reconstruct.append(copy.deepcopy(timeseries[i+steps_round]))
-                    
-                    # Do we have a 1-point only timeseries? If so, manually set the resolution
-                    # as otherwise it would be not defined. # TODO: does it make sense?
-                    if len(timeseries_to_reconstruct) == 1:
-                        timeseries_to_reconstruct._resolution = timeseries.resolution
-
-                    # Apply model inplace
-                    self._apply(timeseries_to_reconstruct, inplace=True)
-                    processed_samples += 1
-
-                    # Store reconstructed values
-                    for j in range(steps_round):
-                        reconstructed_values.append(timeseries_to_reconstruct[j].data[key])
-                    
-                    # Break if we have to
-                    if limit is not None and processed_samples >= limit:
-                        break
+                # Data to be reconstructed
+                timeseries_to_reconstruct = timeseries_class()
+                
+                # Append prev
+                #timeseries_to_reconstruct.append(copy.deepcopy(timeseries[i-1]))
+                
+                # Append in the middle and store real values
+                for j in range(steps_round):
+                    item = timeseries[i+j].clone()
+                    # Set the data_loss to one so the item will be reconstructed
+                    item.data_indexes['data_loss'] = 1
+                    item.data[key] = average_value
+                    timeseries_to_reconstruct.append(item)
+          
+                # Append next
+                #timeseries_to_reconstruct.append(copy.deepcopy(timeseries[i+steps_round]))
+                
+                # Do we have a 1-point only timeseries? If so, manually set the resolution
+                # as otherwise it would be not defined. # TODO: does it make sense?
+                if len(timeseries_to_reconstruct) == 1:
+                    timeseries_to_reconstruct._resolution = timeseries.resolution
+
+                # Apply model inplace
+                self._apply(timeseries_to_reconstruct, inplace=True)
+
+                # Store reconstructed values
+                for j in range(steps_round):
+                    reconstructed_values[processed_samples*steps_round+j] = timeseries_to_reconstruct[j].data[key]
+                processed_samples += 1
+                
+                # Warn if no limit given and we are over
+                if not limit and not warned and i > 10000:
+                    logger.warning('No limit set in the evaluation with a quite long time series, this could take some time.')
+                    warned=True
                     
-                    # Warn if no limit given and we are over
-                    if not limit and not warned and i > 10000:
-                        logger.warning('No limit set in the evaluation with a quite long time series, this could take some time.')
-                        warned=True
-                        
-                if limit and processed_samples < limit:
-                    logger.warning('The evaluation limit is set to "{}" but I have only "{}" samples for "{}" steps'.format(limit, processed_samples, steps_round))
-
-                if not reconstructed_values:
-                    raise Exception('Could not evaluate model, maybe not enough data?')
-
-                # Compute RMSE and ME, and add to the evaluation_score
-                if 'RMSE' in metrics:
-                    evaluation_score['RMSE_{}_steps'.format(steps_round)] = sqrt(mean_squared_error(real_values, reconstructed_values))
-                if 'MAE' in metrics:
-                    evaluation_score['MAE_{}_steps'.format(steps_round)] = mean_absolute_error(real_values, reconstructed_values)
-                if 'MAPE' in metrics:
-                    evaluation_score['MAPE_{}_steps'.format(steps_round)] = mean_absolute_percentage_error(real_values, reconstructed_values)
-
-        # Compute overall RMSE
-        if 'RMSE' in metrics:
-            sum_rmse = 0
-            count = 0
-            for key in evaluation_score:
-                if key.startswith('RMSE_'):
-                    sum_rmse += evaluation_score[key]
-                    count += 1
-            evaluation_score['RMSE'] = sum_rmse/count
-
-        # Compute overall MAE
-        if 'MAE' in metrics:
-            sum_me = 0
-            count = 0
-            for key in evaluation_score:
-                if key.startswith('MAE_'):
-                    sum_me += evaluation_score[key]
-                    count += 1
-            evaluation_score['MAE'] = sum_me/count
-
-        # Compute overall MAPE
-        if 'MAPE' in metrics:
-            sum_me = 0
-            count = 0
-            for key in evaluation_score:
-                if key.startswith('MAPE_'):
-                    sum_me += evaluation_score[key]
-                    count += 1
-            evaluation_score['MAPE'] = sum_me/count
+            if limit and processed_samples < limit:
+                logger.warning('The evaluation limit is set to "{}" but I have only "{}" samples for "{}" steps'.format(limit, processed_samples, steps_round))
+
+            if not len(reconstructed_values):
+                raise Exception('Could not evaluate model, maybe not enough data?')
+
+            # Compute RMSE and ME, and add to the evaluation_score
+            if 'RMSE' in metrics:
+                evaluation_score['RMSE_{}_steps'.format(steps_round)] = sqrt(mean_squared_error(real_values, reconstructed_values))
+            if 'MAE' in metrics:
+                evaluation_score['MAE_{}_steps'.format(steps_round)] = mean_absolute_error(real_values, reconstructed_values)
+            if 'MAPE' in metrics:
+                evaluation_score['MAPE_{}_steps'.format(steps_round)] = mean_absolute_percentage_error(real_values, reconstructed_values)
+
+        # Compute the overall metrics, as the average over all the steps rounds
+        for metric in metrics:
+            evaluation_score[metric] = float(mean([value for label, value in evaluation_score.items() if label.startswith(metric+'_')]))
         
         if not details:
             simple_evaluation_score = {}
@@ -295,19 +253,34 @@ class Reconstructor(TimeSeriesParametricModel):
     def _reconstruct(self, *args, **krargs):
         raise NotImplementedError('Reconstruction for this model is not yet implemented')
 
+    def _reconstruct_gaps(self, timeseries, key, gaps):
+        # Reconstruct the gaps one by one. Models which can reconstruct more gaps at once can override this.
+        for gap_from_index, gap_to_index in gaps:
+            self._reconstruct(from_index=gap_from_index, to_index=gap_to_index, timeseries=timeseries, key=key)
+
 
 
 #=========================
 # P. Average Reconstructor
 #=========================
 
-class PeriodicAverageReconstructor(Reconstructor):
+class PeriodicAverageReconstructor(Reconstructor, PeriodicAverageModel):
     """A reconstuction model based on periodic averages.
     
     Args:
         path (str): a path from which to load a saved model. Will override all other init settings.
     """
-    
+
+    def __init__(self, path=None):
+
+        # Call parent init        
+        super(PeriodicAverageReconstructor, self).__init__(path=path)
+
+        # If loaded (fitted), convert the average dict keys back to integers and set the averages lookup array
+        if self.fitted:
+            self.data['averages'] = {int(key):value for key, value in self.data['averages'].items()}
+            self._set_averages_array()
+
     def fit(self, timeseries, data_loss_threshold=0.5, periodicity='auto', dst_affected=False,  offset_method='average', from_t=None, to_t=None, from_dt=None, to_dt=None):
         # This is a fit wrapper only to allow correct documentation
         """
@@ -351,82 +324,83 @@ class PeriodicAverageReconstructor(Reconstructor):
         self.data['periodicity']  = periodicity
         self.data['dst_affected'] = dst_affected 
                 
-        for key in timeseries.data_labels():
-            sums   = {}
-            totals = {}
-            processed = 0
-            for item in timeseries:
-                
-                # Skip if needed
-                try:
-                    if not item_is_in_range(item, from_t, to_t):
-                        continue
-                except StopIteration:
-                    break
-                
-                # Process. Note: we do fit on data losses = None!
-                if item.data_loss is None or item.data_loss < data_loss_threshold:
-                    periodicity_index = get_periodicity_index(item, timeseries.resolution, periodicity, dst_affected=dst_affected)
-                    if not periodicity_index in sums:
-                        sums[periodicity_index] = item.data[key]
-                        totals[periodicity_index] = 1
-                    else:
-                        sums[periodicity_index] += item.data[key]
-                        totals[periodicity_index] +=1
-                processed += 1
+        key = timeseries.data_labels()[0]
+        
+        # Get the items in range, and extract their data losses, values and periodicity indexes as arrays once
+        items = [timeseries[i] for i in get_in_range_indexes(timeseries, from_t, to_t)]
+        data_losses = self._get_data_losses(items)
+        values = array([item.data[key] for item in items], dtype=float)
+        periodicity_indexes = get_periodicity_indexes(items, timeseries.resolution, periodicity, dst_affected=dst_affected)
+        processed = len(items)
+        
+        # Select the items to fit on, then sum their values and count them by periodicity index all at once. Note: we do
+        # fit on data losses = None! They are NaN in the array, which never compare greater than or equal to the threshold.
+        fit_items = ~(data_losses >= data_loss_threshold)
+        sums = bincount(periodicity_indexes[fit_items], weights=values[fit_items], minlength=periodicity)
+        totals = bincount(periodicity_indexes[fit_items], minlength=periodicity)
 
+        # Only the periodicity indexes which actually had items have an average
         averages={}
-        for periodicity_index in sums:
-            averages[periodicity_index] = sums[periodicity_index]/totals[periodicity_index]
+        for periodicity_index in flatnonzero(totals).tolist():
+            averages[periodicity_index] = float(sums[periodicity_index]/totals[periodicity_index])
         self.data['averages'] = averages
+        self._set_averages_array()
         
         logger.debug('Processed "%s" items', processed)
 
 
-    def _reconstruct(self, timeseries, key, from_index, to_index):
+    def _reconstruct_gaps(self, timeseries, key, gaps):
+        
+        # Compute the periodicity indexes of the items of all the gaps at once, as the
+        # timestamps do not change. Then reconstruct each gap using its own slice.
+        gaps = list(gaps)
+        periodicity_indexes = get_periodicity_indexes([timeseries[j] for from_index, to_index in gaps for j in range(from_index, to_index)],
+                                                      timeseries.resolution, self.data['periodicity'], dst_affected=self.data['dst_affected'])
+        gap_start = 0
+        for from_index, to_index in gaps:
+            gap_end = gap_start + to_index - from_index
+            self._reconstruct(timeseries, key, from_index, to_index, periodicity_indexes=periodicity_indexes[gap_start:gap_end])
+            gap_start = gap_end
+
+    def _reconstruct(self, timeseries, key, from_index, to_index, periodicity_indexes=None):
         logger.debug('Reconstructing between "{}" and "{}"'.format(from_index, to_index-1))
 
+        periodicity = self.data['periodicity']
+        dst_affected = self.data['dst_affected']
+        resolution = timeseries.resolution
+
+        # Get the items to reconstruct and their averages, all at once. Their periodicity
+        # indexes might have been already computed together with other gaps' ones. The
+        # averages are used for both the offset and the reconstruction, which is then
+        # computed in place on them (without further intermediate arrays).
+        items_to_reconstruct = [timeseries[j] for j in range(from_index, to_index)]
+        if periodicity_indexes is None:
+            periodicity_indexes = get_periodicity_indexes(items_to_reconstruct, resolution, periodicity, dst_affected=dst_affected)
+        reconstructed_values = self._get_averages(periodicity_indexes)
+
         # Compute offset (old approach)
         if self.offset_method == 'average':
-            diffs=0
-            for j in range(from_index, to_index):
-                real_value = timeseries[j].data[key]
-                periodicity_index = get_periodicity_index(timeseries[j], timeseries.resolution, self.data['periodicity'], dst_affected=self.data['dst_affected'])
-                reconstructed_value = self.data['averages'][periodicity_index]
-                diffs += (real_value - reconstructed_value)
-            offset = diffs/(to_index-from_index)
+            diffs = array([item.data[key] for item in items_to_reconstruct], dtype=float)
+            diffs -= reconstructed_values
+            offset = float(diffs.mean())
         
         elif self.offset_method == 'extremes':
             # Compute offset (new approach)
-            diffs=0
             try:
-                for j in [from_index-1, to_index+1]:
-                    real_value = timeseries[j].data[key]
-                    periodicity_index = get_periodicity_index(timeseries[j], timeseries.resolution, self.data['periodicity'], dst_affected=self.data['dst_affected'])
-                    reconstructed_value = self.data['averages'][periodicity_index]
-                    diffs += (real_value - reconstructed_value)
-                offset = diffs/2
+                extreme_items = [timeseries[from_index-1], timeseries[to_index+1]]
             except IndexError:
                 offset=0
+            else:
+                real_values = array([item.data[key] for item in extreme_items], dtype=float)
+                offset = float((real_values - self._get_averages(get_periodicity_indexes(extreme_items, resolution, periodicity, dst_affected=dst_affected))).mean())
         else:
             raise Exception('Unknown offset method "{}"'.format(self.offset_method))
 
         # Actually reconstruct
-        for j in range(from_index, to_index):
-            item_to_reconstruct = timeseries[j]
-            periodicity_index = get_periodicity_index(item_to_reconstruct, timeseries.resolution, self.data['periodicity'], dst_affected=self.data['dst_affected'])
-            item_to_reconstruct.data[key] = self.data['averages'][periodicity_index] + offset
+        reconstructed_values += offset
+        for item_to_reconstruct, reconstructed_value in zip(items_to_reconstruct, reconstructed_values.tolist()):
+            item_to_reconstruct.data[key] = reconstructed_value
             item_to_reconstruct.data_indexes['data_reconstructed'] = 1
-                        
-
-    def _plot_averages(self, timeseries, **kwargs):   
-        averages_timeseries = copy.deepcopy(timeseries)
-        for item in averages_timeseries:
-            value = self.data['averages'][get_periodicity_index(item, averages_timeseries.resolution, self.data['periodicity'], dst_affected=self.data['dst_affected'])]
-            if not value:
-                value = 0
-            item.data['periodic_average'] = value 
-        averages_timeseries.plot(**kwargs)
 
 
 #=========================
@@ -460,23 +434,28 @@ class ProphetReconstructor(Reconstructor, ProphetModel):
 
 
     def _reconstruct(self, timeseries, key, from_index, to_index):
-        logger.debug('Reconstructing between "{}" and "{}"'.format(from_index, to_index-1))
-    
-        # Get and prepare data to reconstruct
+        self._reconstruct_gaps(timeseries, key, [(from_index, to_index)])
+
+    def _reconstruct_gaps(self, timeseries, key, gaps):
+
+        # Get the items to reconstruct of all the gaps, as calling Prophet has a significant overhead
+        # and it is much faster to reconstruct all of them with a single prediction.
         items_to_reconstruct = []
-        for j in range(from_index, to_index):
-            items_to_reconstruct.append(timeseries[j])
-        data_to_reconstruct = [self._remove_timezone(dt_from_s(item.t)) for item in items_to_reconstruct]
-        dataframe_to_reconstruct = DataFrame(data_to_reconstruct, columns = ['ds'])
+        for from_index, to_index in gaps:
+            logger.debug('Reconstructing between "{}" and "{}"'.format(from_index, to_index-1))
+            items_to_reconstruct.extend(timeseries[j] for j in range(from_index, to_index))
+        if not items_to_reconstruct:
+            return
+
+        # Prepare data to reconstruct
+        dataframe_to_reconstruct = DataFrame({'ds': self._ds_array_from_t((item.t for item in items_to_reconstruct), count=len(items_to_reconstruct))})
 
         # Apply Prophet fit
         forecast = self.prophet_model.predict(dataframe_to_reconstruct)
         #forecast[['ds', 'yhat', 'yhat_lower', 'yhat_upper']].tail()
 
-        # Ok, replace the values with the reconsturcted ones
-        for i, j in enumerate(range(from_index, to_index)):
-            #logger.debug('Reconstructing item #{} with reconstucted item #{}'.format(j,i))
-            item_to_reconstruct = timeseries[j]
-            item_to_reconstruct.data[key] = forecast['yhat'][i]
+        # Ok, replace the values with the reconsturcted ones (getting them all at once from the dataframe)
+        for item_to_reconstruct, reconstructed_value in zip(items_to_reconstruct, forecast['yhat'].to_numpy().tolist()):
+            item_to_reconstruct.data[key] = reconstructed_value
             item_to_reconstruct.data_indexes['data_reconstructed'] = 1
 
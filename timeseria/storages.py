@@ -701,10 +701,13 @@ class CSVFileStorage(Storage):
                         dt = prev_dt + unit
                         # Note: the equal here is just to prevent endless loops, the check shoudl actally be just an equal     
                         if s_from_dt(dt) >= item[0]:
-                            # We are arrived, append all the missing items and then the item we originally tried to and break
+                            # We are arrived, append all the missing items and then the item we originally tried to and break.
+                            # The previous values and the interpolation increments are the same over all the gap.
+                            prev_data = {data_label: items[i-1][1][data_label] for data_label in items[-1][1]}
+                            increments = {data_label: (items[i][1][data_label]-prev_data[data_label])/(len(missing_timestamps)+1) for data_label in prev_data}
                             for j, missing_timestamp in enumerate(missing_timestamps):
                                 # Set data by interpolation
-                                interpolated_data = {data_label: (((items[i][1][data_label]-items[i-1][1][data_label])/(len(missing_timestamps)+1)) * (j+1)) + items[i-1][1][data_label]  for data_label in  items[-1][1] }
+                                interpolated_data = {data_label: (increments[data_label] * (j+1)) + prev_data[data_label] for data_label in prev_data}
                                 timeseries.append(DataTimeSlot(t=missing_timestamp, unit=unit, data=interpolated_data, data_loss=1, tz=tz))
                             timeseries.append(DataTimeSlot(t=item[0], unit=unit, data=item[1], data_loss=DEFAULT_SLOT_DATA_LOSS, tz=tz))
                             break
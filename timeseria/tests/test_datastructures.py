@@ -1,6 +1,7 @@
 import unittest
 import datetime
 import os
+import copy
 import pandas as pd
 
 from ..datastructures import Point, TimePoint, DataPoint, DataTimePoint
@@ -8,7 +9,7 @@ from ..datastructures import Slot, TimeSlot, DataSlot, DataTimeSlot
 from ..datastructures import Series, SlotSeries, TimePointSeries, TimeSlotSeries, DataSlotSeries
 from ..datastructures import DataTimePointSeries, DataTimeSlotSeries 
 from ..datastructures import SeriesSlice 
-from ..time import UTC, dt
+from ..time import UTC, dt, timezonize
 from ..units import Unit, TimeUnit
 
 # Setup logging
@@ -18,6 +19,16 @@ logger.setup()
 # Set test data path
 TEST_DATA_PATH = '/'.join(os.path.realpath(__file__).split('/')[0:-1]) + '/test_data/'
 
+# Timezone object to compare with (the tests create points and series using its string instead). Note that
+# pytz returns the same object for the same timezone, but not for datetimes localized on it (which have their
+# own per-offset tzinfo), so for points and series created from such datetimes only the name is checked.
+EUROPE_ROME = timezonize('Europe/Rome')
+
+# Demo class that implements the __succedes__ operation
+class IntegerNumber(int):
+    def __succedes__(self, other):
+        return other+1 == self
+
 
 class TestSeries(unittest.TestCase):
 
@@ -59,13 +70,6 @@ class TestSeries(unittest.TestCase):
         with self.assertRaises(ValueError):
             series.remove(18)
 
-        # Demo class that implements the __succedes__ operation
-        class IntegerNumber(int):
-            def __succedes__(self, other):
-                if other+1 != self:
-                    return False
-                else:
-                    return True
         
         zero = IntegerNumber(0)    
         one = IntegerNumber(1)
@@ -155,6 +159,12 @@ class TestPoints(unittest.TestCase):
         self.assertEqual(point_1,point_2)
         self.assertNotEqual(point_1,point_3)
 
+        # Copy
+        point_copy = copy.copy(point_1)
+        self.assertEqual(point_copy, point_1)
+        self.assertIsNot(point_copy, point_1)
+        self.assertEqual(type(point_copy), Point)
+
 
     def test_TimePoint(self):
         
@@ -183,7 +193,12 @@ class TestPoints(unittest.TestCase):
 
         # Init using "dt" with UTC timezone (timesera dt utility always add the UTC timezone)
         time_point_init_dt = TimePoint(dt=dt(1970,1,1,0,0,5))
-        self.assertEqual(time_point_init_dt, time_point) 
+        self.assertEqual(time_point_init_dt, time_point)
+        self.assertEqual(str(time_point_init_dt.tz), 'UTC')
+
+        # Init using "dt" with the standard library UTC timezone (no pytz involved)
+        time_point_init_dt = TimePoint(dt=datetime.datetime(1970,1,1,0,0,5, tzinfo=datetime.timezone.utc))
+        self.assertEqual(time_point_init_dt, time_point)
         self.assertEqual(str(time_point_init_dt.tz), 'UTC')
 
         # Init using "dt" with Europe/Rome timezone (note that we create the dt at 1 AM and not at midnight for this test to pass) 
@@ -197,8 +212,9 @@ class TestPoints(unittest.TestCase):
 
         # Test standard with Europe/Rome timezone
         time_point = TimePoint(t=1569897900, tz='Europe/Rome')
-        self.assertEqual(str(time_point.tz), 'Europe/Rome')
-        self.assertEqual(str(type(time_point.tz)), "<class 'pytz.tzfile.Europe/Rome'>")
+        self.assertIs(time_point.tz, EUROPE_ROME)
+        self.assertEqual(type(time_point.tz).__module__, 'pytz.tzfile')
+        self.assertEqual(type(time_point.tz).__name__, 'Europe/Rome')
         self.assertEqual(str(time_point.dt), '2019-10-01 04:45:00+02:00')
 
         # Cast from object extending the TimePoint
@@ -269,6 +285,17 @@ class TestPoints(unittest.TestCase):
         self.assertEqual(data_time_point.coordinates, (6,)) 
         self.assertEqual(data_time_point.t,6)
         self.assertEqual(data_time_point.data,'hello')
+
+        # Test clone
+        data_time_point = DataTimePoint(t=6, tz='Europe/Rome', data={'a':1}, data_loss=0.5)
+        cloned_data_time_point = data_time_point.clone()
+        self.assertEqual(cloned_data_time_point, data_time_point)
+        self.assertEqual(cloned_data_time_point.tz, data_time_point.tz)
+        self.assertEqual(cloned_data_time_point.data_loss, 0.5)
+        cloned_data_time_point.data['a'] = 2
+        cloned_data_time_point.data_indexes['data_loss'] = 0
+        self.assertEqual(data_time_point.data['a'], 1)
+        self.assertEqual(data_time_point.data_loss, 0.5)
         
 
     def test_casting(self):
@@ -302,7 +329,7 @@ class TestPointSeries(unittest.TestCase):
         # Test for Europe/Rome timezone
         time_point_series = TimePointSeries() 
         time_point_series.append(TimePoint(t=15, tz='Europe/Rome'))
-        self.assertEqual(str(time_point_series.tz), 'Europe/Rome')
+        self.assertIs(time_point_series.tz, EUROPE_ROME)
 
         # Test for Europe/Rome timezone
         time_point_series = TimePointSeries() 
@@ -317,32 +344,26 @@ class TestPointSeries(unittest.TestCase):
         time_point_series.append(TimePoint(t=5))
         time_point_series.append(TimePoint(t=10))
         time_point_series.change_timezone('Europe/Rome')
-        self.assertEqual(str(time_point_series.tz), 'Europe/Rome')
-        self.assertEqual(str(type(time_point_series.tz)), "<class 'pytz.tzfile.Europe/Rome'>")
-        self.assertEqual(str(time_point_series[0].tz), 'Europe/Rome')
+        self.assertIs(time_point_series.tz, EUROPE_ROME)
+        self.assertIs(time_point_series[0].tz, EUROPE_ROME)
 
         # Test for Europe/Rome timezone (set)
         time_point_series = TimePointSeries(tz = 'Europe/Rome')
-        self.assertEqual(str(time_point_series.tz), 'Europe/Rome')
-        self.assertEqual(str(type(time_point_series.tz)), "<class 'pytz.tzfile.Europe/Rome'>")
+        self.assertIs(time_point_series.tz, EUROPE_ROME)
         time_point_series.append(TimePoint(t=5))
-        self.assertEqual(str(time_point_series.tz), 'Europe/Rome')
-        self.assertEqual(str(type(time_point_series.tz)), "<class 'pytz.tzfile.Europe/Rome'>")        
+        self.assertIs(time_point_series.tz, EUROPE_ROME)
          
         # Test for Europe/Rome timezone  (autodetect)
         time_point_series = TimePointSeries()
         time_point_series.append(TimePoint(t=1569897900, tz='Europe/Rome')) 
-        self.assertEqual(str(time_point_series.tz), 'Europe/Rome')
-        self.assertEqual(str(type(time_point_series.tz)), "<class 'pytz.tzfile.Europe/Rome'>")
+        self.assertIs(time_point_series.tz, EUROPE_ROME)
         time_point_series.append(TimePoint(t=1569897910, tz='Europe/Rome')) 
-        self.assertEqual(str(time_point_series.tz), 'Europe/Rome')
-        self.assertEqual(str(type(time_point_series.tz)), "<class 'pytz.tzfile.Europe/Rome'>")
+        self.assertIs(time_point_series.tz, EUROPE_ROME)
         time_point_series.append(TimePoint(t=1569897920))
         self.assertEqual(time_point_series.tz, UTC)
         self.assertEqual(type(time_point_series.tz), type(UTC))
         time_point_series.change_timezone('Europe/Rome')
-        self.assertEqual(str(time_point_series.tz), 'Europe/Rome')
-        self.assertEqual(str(type(time_point_series.tz)), "<class 'pytz.tzfile.Europe/Rome'>")  
+        self.assertIs(time_point_series.tz, EUROPE_ROME)
         
         # Test resolution: not defined as just one point
         time_point_series = TimePointSeries(TimePoint(t=60))
@@ -668,6 +689,19 @@ class TestSlots(unittest.TestCase):
         self.assertEqual(data_time_slot_1, data_time_slot_2)
         self.assertNotEqual(data_time_slot_1, data_time_slot_3)
 
+        # Test clone
+        data_time_slot = DataTimeSlot(start=TimePoint(t=1), end=TimePoint(t=2), data={'a':1}, data_loss=0.5)
+        cloned_data_time_slot = data_time_slot.clone()
+        self.assertEqual(cloned_data_time_slot, data_time_slot)
+        self.assertEqual(cloned_data_time_slot.unit, data_time_slot.unit)
+        self.assertEqual(cloned_data_time_slot.data_loss, 0.5)
+        cloned_data_time_slot.data['a'] = 2
+        cloned_data_time_slot.data_indexes['data_loss'] = 0
+        cloned_data_time_slot.change_timezone('Europe/Rome')
+        self.assertEqual(data_time_slot.data['a'], 1)
+        self.assertEqual(data_time_slot.data_loss, 0.5)
+        self.assertEqual(str(data_time_slot.start.tz), 'UTC')
+
 
 
 class TestSlotSeries(unittest.TestCase):
@@ -831,16 +865,15 @@ class TestSlotSeries(unittest.TestCase):
  
 
         # Test change timezone
-        from ..time import timezonize
         data_time_slot_series_UTC =  DataTimeSlotSeries(DataTimeSlot(start=TimePoint(t=60),  end=TimePoint(t=120), data=23.8),
                                                         DataTimeSlot(start=TimePoint(t=120), end=TimePoint(t=180), data=24.1),
                                                         DataTimeSlot(start=TimePoint(t=180), end=TimePoint(t=240), data=23.1))
 
         data_time_slot_series_UTC.change_timezone('Europe/Rome')
-        self.assertEqual(data_time_slot_series_UTC.tz, timezonize('Europe/Rome'))
-        self.assertEqual(data_time_slot_series_UTC[0].tz, timezonize('Europe/Rome'))
-        self.assertEqual(data_time_slot_series_UTC[0].start.tz, timezonize('Europe/Rome'))
-        self.assertEqual(data_time_slot_series_UTC[0].end.tz, timezonize('Europe/Rome'))
+        self.assertIs(data_time_slot_series_UTC.tz, EUROPE_ROME)
+        self.assertIs(data_time_slot_series_UTC[0].tz, EUROPE_ROME)
+        self.assertIs(data_time_slot_series_UTC[0].start.tz, EUROPE_ROME)
+        self.assertIs(data_time_slot_series_UTC[0].end.tz, EUROPE_ROME)
 
     
         # Test get item by string key (filter on data labels). More testing is done in the operation tests
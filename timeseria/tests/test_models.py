@@ -3,7 +3,7 @@ import os
 import tempfile
 from math import sin, cos
 from ..datastructures import DataTimeSlotSeries, DataTimeSlot, TimePoint, DataTimePoint, DataTimePointSeries
-from ..models import Model, ParametricModel, TimeSeriesParametricModel, KerasModel
+from ..models import Model, ParametricModel, TimeSeriesParametricModel, KerasModel, Forecaster
 from ..models import PeriodicAverageReconstructor, PeriodicAverageForecaster, PeriodicAverageAnomalyDetector
 from ..models import ProphetForecaster, ProphetReconstructor
 from ..models import ARIMAForecaster, AARIMAForecaster
@@ -176,6 +176,11 @@ class TestReconstructors(unittest.TestCase):
         # Fit
         periodic_average_reconstructor.fit(data_time_slot_series)
         
+        # The averages lookup array has the same averages as the dict
+        self.assertEqual(len(periodic_average_reconstructor._averages_array), periodic_average_reconstructor.data['periodicity'])
+        for periodicity_index, average in periodic_average_reconstructor.data['averages'].items():
+            self.assertEqual(periodic_average_reconstructor._averages_array[periodicity_index], average)
+        
         # Evaluate
         evaluation = periodic_average_reconstructor.evaluate(data_time_slot_series, limit=100, details=True)
         self.assertAlmostEqual(evaluation['RMSE_1_steps'], 0.138541066038798)
@@ -204,7 +209,17 @@ class TestReconstructors(unittest.TestCase):
                     pass
                 else:
                     self.assertNotEqual(data_time_slot_series_reconstructed[i].data, data_time_slot_series[i].data, 'at position {}'.format(i))
-        
+
+        # Apply with gaps on periodicity indexes without any fitted items
+        lossy_data_time_slot_series = DataTimeSlotSeries()
+        for i in range(40):
+            data_loss = 1 if i % 4 == 2 else 0
+            lossy_data_time_slot_series.append(DataTimeSlot(start=TimePoint(i*60), end=TimePoint((i+1)*60), data={'value':i%4}, data_loss=data_loss))
+        periodic_average_reconstructor = PeriodicAverageReconstructor()
+        periodic_average_reconstructor.fit(lossy_data_time_slot_series, periodicity=4)
+        with self.assertRaises(ValueError):
+            periodic_average_reconstructor.apply(lossy_data_time_slot_series)
+
         # Fit from/to
         periodic_average_reconstructor = PeriodicAverageReconstructor()
         periodic_average_reconstructor.fit(data_time_slot_series, from_dt=dt(2019,3,1), to_dt=dt(2019,4,1))
@@ -285,6 +300,16 @@ class TestForecasters(unittest.TestCase):
     def test_PeriodicAverageForecaster(self):
                  
         forecaster = PeriodicAverageForecaster()
+
+        # Cannot forecast if not fitted
+        with self.assertRaises(NotFittedError):
+            forecaster.forecast(self.sine_series_minute, forecast_start=100)
+
+        # A forecaster with no predict logic does not support the forecast start
+        class ForecasterMock(Forecaster):
+            def _fit(self, *args, **kwargs):
+                pass
+        self.assertFalse(ForecasterMock()._supports_forecast_start)
         
         # Fit
         forecaster.fit(self.sine_series_minute, periodicity=63)
@@ -301,30 +326,53 @@ class TestForecasters(unittest.TestCase):
         # Evaluate
         evaluation = forecaster.evaluate(self.sine_series_minute, steps='auto', limit=100, details=True)
         self.assertEqual(forecaster.data['periodicity'], 63)
-        self.assertAlmostEqual(evaluation['RMSE_1_steps'], 0.07318673229600292)
-        self.assertAlmostEqual(evaluation['MAE_1_steps'], 0.06622794526818285)
-        self.assertAlmostEqual(evaluation['RMSE_63_steps'], 0.06697755802373265)
-        self.assertAlmostEqual(evaluation['MAE_63_steps'], 0.06016205183857482)     
-        self.assertAlmostEqual(evaluation['RMSE'], 0.07008214515986778)
-        self.assertAlmostEqual(evaluation['MAE'], 0.06319499855337883)
+        self.assertAlmostEqual(evaluation['RMSE_1_steps'], 0.07319006639100822)
+        self.assertAlmostEqual(evaluation['MAE_1_steps'], 0.06623090185457585)
+        self.assertAlmostEqual(evaluation['RMSE_63_steps'], 0.06697754862356795)
+        self.assertAlmostEqual(evaluation['MAE_63_steps'], 0.06016151394735312)     
+        self.assertAlmostEqual(evaluation['RMSE'], 0.07008380750728808)
+        self.assertAlmostEqual(evaluation['MAE'], 0.06319620790096449)
 
         # Evaluate
         evaluation = forecaster.evaluate(self.sine_series_minute, steps=[1,3], limit=100, details=True)
         self.assertEqual(forecaster.data['periodicity'], 63)
-        self.assertAlmostEqual(evaluation['RMSE_1_steps'], 0.07318673229600292)
-        self.assertAlmostEqual(evaluation['MAE_1_steps'], 0.06622794526818285)
-        self.assertAlmostEqual(evaluation['RMSE_3_steps'], 0.07253018513852955)
-        self.assertAlmostEqual(evaluation['MAE_3_steps'], 0.06567523200748912)     
+        self.assertAlmostEqual(evaluation['RMSE_1_steps'], 0.07319006639100822)
+        self.assertAlmostEqual(evaluation['MAE_1_steps'], 0.06623090185457585)
+        self.assertAlmostEqual(evaluation['RMSE_3_steps'], 0.07253666291459365)
+        self.assertAlmostEqual(evaluation['MAE_3_steps'], 0.06568097342619722)
+
+        # Evaluate the MAPE, with the evaluation time series. The per-item APEs are absolute, also for negative true values.
+        evaluation = forecaster.evaluate(self.sine_series_minute, steps=[1], limit=100, metrics=['MAPE'], evaluation_timeseries=True)
+        evaluation_timeseries = evaluation['evaluation_timeseries']
+        self.assertTrue(any(item.data['value'] < 0 for item in evaluation_timeseries))
+        for item in evaluation_timeseries:
+            self.assertAlmostEqual(item.data['value_APE'], abs((item.data['value'] - item.data['value_pred']) / item.data['value']))
+        self.assertAlmostEqual(evaluation['MAPE'], sum(item.data['value_APE'] for item in evaluation_timeseries) / len(evaluation_timeseries))
+
+        # One step-ahead predictions all at once
+        predicteds = forecaster._predict_one_step_ahead(self.sine_series_minute, 64, 100)
+        self.assertEqual(len(predicteds), 36)
+        for j, i in enumerate(range(64, 100)):
+            self.assertAlmostEqual(predicteds[j], forecaster.predict(self.sine_series_minute, steps=1, forecast_start=i-1)[0]['value'])
+        with self.assertRaises(ValueError):
+            forecaster._predict_one_step_ahead(self.sine_series_day, 64, 100)
 
         # Fit from/to
         forecaster.fit(self.sine_series_minute, from_t=20000, to_t=40000)
         evaluation = forecaster.evaluate(self.sine_series_minute, steps=[1,3], limit=100, details=True)
-        self.assertAlmostEqual(evaluation['RMSE_1_steps'], 0.37831442005531923)
+        self.assertAlmostEqual(evaluation['RMSE_1_steps'], 0.3782703204942496)
 
         # Fit to/from
         forecaster.fit(self.sine_series_minute, to_t=20000, from_t=40000)
         evaluation = forecaster.evaluate(self.sine_series_minute, steps=[1,3], limit=100, details=True)
-        self.assertAlmostEqual(evaluation['RMSE_1_steps'], 0.36033834603736264)
+        self.assertAlmostEqual(evaluation['RMSE_1_steps'], 0.3602614570205045)
+
+        # Fit on less items than the periodicity, so that some periodicity indexes have no averages
+        forecaster.fit(self.sine_series_minute, periodicity=63, from_t=0, to_t=1200)
+        with self.assertRaises(ValueError):
+            forecaster.predict(self.sine_series_minute, steps=3)
+        with self.assertRaises(ValueError):
+            forecaster._predict_one_step_ahead(self.sine_series_minute, 64, 100)
 
         # Test on Points as well
         data_time_point_series = CSVFileStorage(TEST_DATA_PATH + '/csv/temperature.csv').get(limit=200)
@@ -593,7 +641,7 @@ class TestAnomalyDetectors(unittest.TestCase):
         
         anomaly_detector.fit(self.sine_series_minute, periodicity=63)
         
-        self.assertAlmostEqual(anomaly_detector.data['AE_threshold'], 0.5914733390853167)
+        self.assertAlmostEqual(anomaly_detector.data['AE_threshold'], 0.5913904530311846)
         
         result_time_series = anomaly_detector.apply(self.sine_series_minute)
 
@@ -604,6 +652,14 @@ class TestAnomalyDetectors(unittest.TestCase):
                 anomalies_count += 1
         self.assertEqual(anomalies_count, 9)
 
+        # Test on time series with no items after the forecaster window plus one
+        self.assertEqual(len(anomaly_detector.apply(self.sine_series_minute[0:64])), 0)
+        self.assertEqual(len(anomaly_detector.apply(self.sine_series_minute[0:40])), 0)
+
+        # Cannot fit on a time series with no items after the forecaster window plus one
+        with self.assertRaises(ValueError):
+            PeriodicAverageAnomalyDetector().fit(self.sine_series_minute[0:64], periodicity=63)
+
 
         # Test on Points as well
         data_time_point_series = CSVFileStorage(TEST_DATA_PATH + '/csv/temperature.csv').get(limit=200)
@@ -2,8 +2,10 @@ import unittest
 import os
 from ..utilities import detect_encoding, get_periodicity, detect_sampling_interval
 from ..utilities import compute_coverage, compute_data_loss, compute_validity_regions 
+from ..utilities import item_is_in_range, get_in_range_indexes, get_periodicity_index, get_periodicity_indexes
+from ..utilities import mean_absolute_percentage_error
 
-from ..datastructures import DataTimePointSeries, DataTimePoint
+from ..datastructures import DataTimePointSeries, DataTimePoint, DataTimeSlotSeries, DataTimeSlot, TimePoint
 from ..time import dt, s_from_dt
 from ..storages import CSVFileStorage
 from ..transformations import Aggregator
@@ -374,6 +376,82 @@ class TestGetPeriodicity(unittest.TestCase):
         self.assertEqual(perdiodicity, 24)
 
 
+class TestGetInRangeIndexes(unittest.TestCase):
+
+    def test_get_in_range_indexes(self):
+
+        data_time_point_series = DataTimePointSeries()
+        data_time_slot_series = DataTimeSlotSeries()
+        for i in range(10):
+            data_time_point_series.append(DataTimePoint(t=i*60, data={'value':i}))
+            data_time_slot_series.append(DataTimeSlot(start=TimePoint(t=i*60), end=TimePoint(t=(i+1)*60), data={'value':i}))
+
+        # Check against looping over the items with item_is_in_range(), as the models used to do
+        for series in [data_time_point_series, data_time_slot_series]:
+            for from_t, to_t in [(None, None), (120, None), (None, 300), (120, 300), (130, 290),
+                                 (0, 600), (700, None), (None, -10), (420, 180), (450, 150)]:
+                in_range_indexes = []
+                for i, item in enumerate(series):
+                    try:
+                        if item_is_in_range(item, from_t, to_t):
+                            in_range_indexes.append(i)
+                    except StopIteration:
+                        break
+                self.assertEqual(list(get_in_range_indexes(series, from_t, to_t)), in_range_indexes,
+                                 'for {} with from_t={} and to_t={}'.format(series.__class__.__name__, from_t, to_t))
+
+        # Empty series
+        self.assertEqual(list(get_in_range_indexes(DataTimePointSeries(), 120, 300)), [])
+
+
+class TestGetPeriodicityIndexes(unittest.TestCase):
+
+    def test_get_periodicity_indexes(self):
+
+        # Hourly points and slots across the Europe/Rome DST change of the 31st of March 2019
+        start_t = s_from_dt(dt(2019,3,30, tz='Europe/Rome'))
+        data_time_point_series = DataTimePointSeries()
+        data_time_slot_series = DataTimeSlotSeries()
+        for i in range(72):
+            data_time_point_series.append(DataTimePoint(t=start_t+i*3600, tz='Europe/Rome', data={'value':i}))
+            data_time_slot_series.append(DataTimeSlot(start=TimePoint(t=start_t+i*3600, tz='Europe/Rome'), unit=TimeUnit('1h'), data={'value':i}))
+
+        # Daily slots across the same DST change (calendar time unit)
+        daily_data_time_slot_series = DataTimeSlotSeries()
+        start = TimePoint(t=s_from_dt(dt(2019,3,25, tz='Europe/Rome')), tz='Europe/Rome')
+        for i in range(14):
+            daily_data_time_slot_series.append(DataTimeSlot(start=start, unit=TimeUnit('1D'), data={'value':i}))
+            start = daily_data_time_slot_series[-1].end
+
+        # Check against calling get_periodicity_index() on each item (daily slots cannot be DST-affected)
+        for series, periodicity, dst_affected in [(data_time_point_series, 24, False), (data_time_point_series, 24, True),
+                                                  (data_time_slot_series, 24, False), (data_time_slot_series, 24, True),
+                                                  (daily_data_time_slot_series, 7, False)]:
+            self.assertEqual(get_periodicity_indexes(series, series.resolution, periodicity, dst_affected=dst_affected).tolist(),
+                             [get_periodicity_index(item, series.resolution, periodicity, dst_affected=dst_affected) for item in series],
+                             'for {} with dst_affected={}'.format(series.__class__.__name__, dst_affected))
+
+        # The DST change (from 01:00+01:00 to 03:00+02:00) shifts the indexes only if DST-affected
+        self.assertEqual(get_periodicity_indexes(data_time_point_series, data_time_point_series.resolution, 24).tolist()[24:27], [23, 0, 1])
+        self.assertEqual(get_periodicity_indexes(data_time_point_series, data_time_point_series.resolution, 24, dst_affected=True).tolist()[24:27], [23, 0, 2])
+
+
+class TestMeanAbsolutePercentageError(unittest.TestCase):
+
+    def test_mean_absolute_percentage_error(self):
+
+        # The percentage errors are absolute, also for negative true values
+        self.assertAlmostEqual(mean_absolute_percentage_error([1, -2], [2, -1]), 0.75)
+        self.assertAlmostEqual(mean_absolute_percentage_error([-4], [-2]), 0.5)
+
+        with self.assertRaises(ValueError):
+            mean_absolute_percentage_error([1, 2], [1])
+
+        # Zero true values are not supported
+        with self.assertRaises(ZeroDivisionError):
+            mean_absolute_percentage_error([0, 1], [1, 1])
+
+
 class TestDetectSamplingInterval(unittest.TestCase):
 
     def test_detect_sampling_interval(self):
@@ -5,7 +5,7 @@ import os
 import re
 import chardet
 from chardet.universaldetector import UniversalDetector
-from numpy import fft
+from numpy import fft, array, argsort, hypot, searchsorted, trunc, int64
 from scipy.signal import find_peaks
 from .exceptions import ConsistencyException
 from datetime import datetime
@@ -91,6 +91,36 @@ def item_is_in_range(item, from_t, to_t):
         
 
 
+def get_in_range_indexes(series, from_t, to_t):
+    """Get the indexes of the series items which are in the from_t/to_t range, according to the same logic
+    of item_is_in_range(), including the "wrapped" range case where from_t is greater than to_t. Since the
+    series is ordered, the range boundaries are found by bisection instead of checking every item."""
+    from .datastructures import Slot
+    
+    if from_t is None and to_t is None:
+        return range(len(series))
+    
+    if not series:
+        return range(0)
+    
+    # Get the start and end timestamps as arrays. For points, they are the same.
+    if isinstance(series[0], Slot):
+        starts_t = array([item.start.t for item in series])
+        ends_t = array([item.end.t for item in series])
+    else:
+        starts_t = ends_t = array([item.t for item in series])
+    
+    if from_t is not None and to_t is not None and from_t > to_t:
+        # Items up to to_t, and then items starting from from_t
+        to_index = int(searchsorted(ends_t, to_t, side='right'))
+        from_index = int(searchsorted(starts_t, from_t, side='left'))
+        return list(range(0, to_index)) + list(range(from_index, len(series)))
+    else:
+        from_index = int(searchsorted(starts_t, from_t, side='left')) if from_t is not None else 0
+        to_index = int(searchsorted(ends_t, to_t, side='right')) if to_t is not None else len(series)
+        return range(from_index, max(from_index, to_index))
+
+
 def detect_encoding(filename, streaming=False):
     
     if streaming:
@@ -418,14 +448,10 @@ def get_periodicity(timeseries):
     if len(data_labels) > 1:
         raise NotImplementedError()
 
-    # TODO: improve me, highly ineficcient
     for key in data_labels:
         
         # Get data as a vector
-        y = []
-        for item in timeseries:
-            y.append(item.data[key])
-        #y = [item.data[key] for item in timeseries]
+        y = array([item.data[key] for item in timeseries])
 
         # Compute FFT (Fast Fourier Transform)
         yf = fft.fft(y)
@@ -435,19 +461,17 @@ def get_periodicity(timeseries):
         middle_point=round(len_yf/2)
         yf = yf[0:middle_point]
         
-        # To absolute values
-        yf = [abs(f) for f in yf]
+        # To absolute values (using hypot, which is what Python does for complex numbers)
+        yf = hypot(yf.real, yf.imag)
             
         # Find FFT peaks
         peak_indexes, _ = find_peaks(yf, height=None)
-        peaks = []
-        for i in peak_indexes:
-            peaks.append([i, yf[i]])
         
-        # Sort by peaks intensity and compute actual frequency in base units
+        # Sort by peaks intensity (descending, and with the same order for ties as a stable sort
+        # followed by a reverse) and compute actual frequency in base units
         # TODO: round peak frequencies to integers and/or neighbours first
-        peaks = sorted(peaks, key=lambda t: t[1])
-        peaks.reverse()
+        peak_indexes = peak_indexes[argsort(yf[peak_indexes], kind='stable')[::-1]]
+        peaks = [[i, peak_value] for i, peak_value in zip(peak_indexes.tolist(), yf[peak_indexes].tolist())]
         
         # Compute peak frequencies:
         for i in range(len(peaks)):
@@ -486,10 +510,10 @@ def mean_absolute_percentage_error(list1, list2):
     '''Computes the MAPE, list 1 are true values, list2 are predicted values'''
     if len(list1) != len(list2):
         raise ValueError('Lists have different lengths, cannot continue')
-    p_error_sum = 0
-    for i in range(len(list1)):
-        p_error_sum += abs((list1[i] - list2[i])/list1[i])
-    return p_error_sum/len(list1)
+    list1 = array(list1, dtype=float)
+    if (list1 == 0).any():
+        raise ZeroDivisionError('Cannot compute the MAPE if some true values are zero')
+    return float(abs((list1 - array(list2, dtype=float))/list1).mean())
 
 
 def get_periodicity_index(item, resolution, periodicity, dst_affected=False):
@@ -538,6 +562,31 @@ def get_periodicity_index(item, resolution, periodicity, dst_affected=False):
             periodicity_index = (int((item.t + dst_offset_s) / resolution_s) % periodicity)
 
     return periodicity_index
+
+
+def get_periodicity_indexes(series, resolution, periodicity, dst_affected=False):
+    """Get the periodicity indexes of all the series items at once, as an array of integers. Same
+    as calling get_periodicity_index() on each item, but vectorized if the resolution is fixed."""
+    from .units import Unit, TimeUnit
+    
+    # Calendar time units and DST effects require to look at each item datetime 
+    if dst_affected or (isinstance(resolution, TimeUnit) and resolution.is_calendar()):
+        return array([get_periodicity_index(item, resolution, periodicity, dst_affected=dst_affected) for item in series], dtype=int64)
+    
+    if isinstance(resolution, TimeUnit):  
+        resolution_s = resolution.as_seconds()
+    elif isinstance(resolution, Unit):  
+        if isinstance(resolution.value, list):
+            raise NotImplementedError('Sorry, periodocity in multi-dimensional spaces are not defined')
+        resolution_s = resolution.value
+    else:
+        if isinstance(resolution, list):
+            raise NotImplementedError('Sorry, periodocity in multi-dimensional spaces are not defined')
+        resolution_s = resolution
+    
+    # Get indexes based on items timestamps, normalized to unit (truncating as int() does), modulus periodicity
+    ts = array([item.t for item in series], dtype=float)
+    return trunc(ts / resolution_s).astype(int64) % periodicity
     
     
 #==============================